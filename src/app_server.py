@@ -1,11 +1,26 @@
+import asyncio
+import os
+from contextlib import asynccontextmanager
+
 from fastapi import FastAPI
 from typing import Optional
 from src.main.tools.rss_feed_utils import register_feed as register
 from src.main.tools.registry import list_feeds
-from src.main.tools.fetcher import fetch_all_entries, fetch_feed
+from src.main.tools.fetcher import fetch_all_entries, fetch_feed, close_http_client
+from src.main.tools.summarizer import close_session as close_summarizer_session
 import uvicorn
 from typing import List, Dict
 
+
+@asynccontextmanager
+async def lifespan(_: FastAPI):
+    yield
+    # Release pooled keep-alive connections held by the feed fetcher and the
+    # summarizer.
+    await close_http_client()
+    await close_summarizer_session()
+
+
 app = FastAPI(
     title="FeedQuest API",
     description="Extract RSS/Atom feed URLs from a given site URL.",
@@ -13,6 +28,7 @@ app = FastAPI(
     docs_url="/docs",        # Swagger UI
     redoc_url="/redoc",      # ReDoc UI
     openapi_url="/openapi.json",
+    lifespan=lifespan,
 )
 
 @app.get("/", tags=["Root"], summary="API root")
@@ -22,8 +38,8 @@ async def read_root():
 @app.post("/registerFeed", tags=["Feed"], summary="Register feed URL",
           description="Register the discovered feed URL in the local registry.")
 async def register_feed(site_url: str) -> dict:
-    # Reuse the shared registration logic
-    return register(site_url)
+    # Reuse the shared registration logic; it blocks on HTTP and SQLite.
+    return await asyncio.to_thread(register, site_url)
 
 @app.get(
     path="/listFeeds",
@@ -32,7 +48,7 @@ async def register_feed(site_url: str) -> dict:
     description="Return all registered feeds with metadata as a JSON list.",
 )
 async def list_registered_feeds() -> List[Dict[str, str]]:
-    feeds = list_feeds()
+    feeds = await asyncio.to_thread(list_feeds)
     if not feeds:
         # Return an empty list; the client can interpret as no feeds.
         return []
@@ -70,8 +86,22 @@ async def fetch_entries_endpoint(urls: Optional[List[str]] = None) -> dict:
 
 
 def main():
-    # bind to localhost interface and enable reload for development
-    uvicorn.run(app, host="127.0.0.1", port=8090, reload=True)
+    # Bind to localhost by default.  ``loop``/``http`` "auto" pick the uvloop
+    # event loop and httptools parser when they are installed (see
+    # requirements.txt).  One worker by default: the summarizer's rate limit
+    # and concurrency caps and the in-flight fetch coalescing are per process,
+    # so N workers send up to N times MAX_REQUESTS_PER_MINUTE to Groq.  Extra
+    # workers (``WORKERS``) are opt-in; they need the app as an import string,
+    # and SQLite WAL + busy_timeout make their concurrent writes safe.
+    uvicorn.run(
+        "src.app_server:app",
+        host=os.environ.get("HOST", "127.0.0.1"),
+        port=int(os.environ.get("PORT", "8090")),
+        loop="auto",
+        http="auto",
+        workers=int(os.environ.get("WORKERS", "1")),
+        reload=False,
+    )
 
 if __name__ == "__main__":
     main()
@@ -4,10 +4,15 @@ This module centralises connection handling and schema initialisation.  By
 keeping the *SQL* in a separate ``db_schema.sql`` file we make future schema
 migrations straightforward – you can edit the SQL file and add a migration
 script without touching the business‑logic code in ``registry.py``.
+
+The database runs in WAL mode, so readers such as ``list_feeds`` are not
+blocked while the fetcher is writing entries, and commits append to the log
+instead of fsyncing the main file.
 """
 
 from __future__ import annotations
 
+import atexit
 import os
 import sqlite3
 from pathlib import Path
@@ -19,13 +24,39 @@ DB_PATH = os.path.abspath(os.path.join(os.path.dirname(__file__), "..", "..", "f
 _pool: Queue | None = None
 _pool_lock = Lock()
 _pool_size = 5
+# ``init_schema`` runs once, when the first connection is requested, rather than
+# as a side effect of importing the registry.
+_schema_ready = False
+
+# WAL lets readers and writers proceed concurrently.  The journal mode is
+# stored in the database file, so it is set once by ``init_schema``.
+_DB_PRAGMAS = "PRAGMA journal_mode=WAL;"
+# ``synchronous=NORMAL`` drops the fsync from every commit.  These settings are
+# per connection, so they are applied to every pool member when it is opened.
+_CONNECTION_PRAGMAS = """
+PRAGMA synchronous=NORMAL;
+PRAGMA temp_store=MEMORY;
+PRAGMA cache_size=-64000;
+PRAGMA mmap_size=268435456;
+PRAGMA busy_timeout=5000;
+PRAGMA foreign_keys=ON;
+"""
+
+def _connect() -> sqlite3.Connection:
+    """Open a new SQLite connection with the FeedQuest pragmas applied."""
+    conn = sqlite3.connect(DB_PATH, timeout=5, check_same_thread=False)
+    conn.executescript(_CONNECTION_PRAGMAS)
+    return conn
 
 def _init_pool() -> None:
-    """Initialize the connection pool."""
-    global _pool
+    """Initialize the connection pool, creating the schema on first use."""
+    global _pool, _schema_ready
+    if not _schema_ready:
+        init_schema()
+        _schema_ready = True
     _pool = Queue(maxsize=_pool_size)
     for _ in range(_pool_size):
-        conn = sqlite3.connect(DB_PATH, timeout=5, check_same_thread=False)
+        conn = _connect()
         conn.row_factory = sqlite3.Row
         _pool.put(conn)
 
@@ -50,6 +81,22 @@ def get_connection() -> sqlite3.Connection:
     finally:
         _pool.put(conn)
 
+def close_pool() -> None:
+    """Close every pooled connection.
+
+    Registered with ``atexit`` so the WAL is checkpointed and the ``-wal`` /
+    ``-shm`` files are cleaned up when the process exits.
+    """
+    global _pool
+    with _pool_lock:
+        if _pool is None:
+            return
+        while not _pool.empty():
+            _pool.get_nowait().close()
+        _pool = None
+
+atexit.register(close_pool)
+
 def init_schema() -> None:
     """Create tables if they do not exist.
 
@@ -64,8 +111,9 @@ def init_schema() -> None:
         sql = f.read()
 
     # Create a fresh connection for schema initialization (outside pool)
-    conn = sqlite3.connect(DB_PATH, timeout=5, check_same_thread=False)
+    conn = _connect()
     try:
+        conn.executescript(_DB_PRAGMAS)
         conn.executescript(sql)
         conn.commit()
         # ---------------------------------------------------------------------
@@ -87,6 +135,13 @@ def init_schema() -> None:
             )
             cur.execute("DROP TABLE feeds_old")
             conn.commit()
+        # Migration: ``content_hash`` stores the SHA-256 of the last fetched
+        # feed body so unchanged feeds can skip parsing.
+        cur.execute("PRAGMA table_info(feeds)")
+        cols = [row[1] for row in cur.fetchall()]
+        if "content_hash" not in cols:
+            cur.execute("ALTER TABLE feeds ADD COLUMN content_hash TEXT")
+            conn.commit()
         cur.close()
     finally:
         conn.close()
@@ -6,9 +6,13 @@ CREATE TABLE IF NOT EXISTS feeds (
     title TEXT,
     etag TEXT,
     last_modified TEXT,
+    content_hash TEXT,
     added TEXT NOT NULL
 );
 
+-- ``fetch_batch`` picks the least recently processed feeds.
+CREATE INDEX IF NOT EXISTS idx_feeds_last_modified ON feeds(last_modified);
+
 CREATE TABLE IF NOT EXISTS entries (
     id INTEGER PRIMARY KEY AUTOINCREMENT,
     feed_id INTEGER NOT NULL REFERENCES feeds(id) ON DELETE CASCADE,
@@ -23,9 +27,23 @@ CREATE TABLE IF NOT EXISTS entries (
     added TEXT NOT NULL
 );
 
+-- ``list_entries_by_feed`` reads a feed's newest entries straight off this
+-- index instead of sorting them.  ``feeds.url`` is already indexed by UNIQUE.
+CREATE INDEX IF NOT EXISTS idx_entries_feed_published ON entries(feed_id, published DESC);
+
 -- Optional table for dense embeddings (binary BLOB)
 CREATE TABLE IF NOT EXISTS entry_embeddings (
     entry_id INTEGER PRIMARY KEY REFERENCES entries(id) ON DELETE CASCADE,
     model TEXT NOT NULL,
     vector BLOB NOT NULL
 );
+
+-- LLM summaries keyed by SHA-256 of the model, prompt and summarised text
+-- (``summarizer.summary_cache_key``), so reposted or duplicated content is
+-- never sent to the model twice.
+CREATE TABLE IF NOT EXISTS summary_cache (
+    hash TEXT PRIMARY KEY,
+    summary TEXT NOT NULL,
+    ai_tags TEXT,
+    created REAL NOT NULL
+);
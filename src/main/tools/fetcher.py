@@ -10,66 +10,169 @@ number of entries successfully inserted.
 from __future__ import annotations
 
 import asyncio
+import hashlib
 import logging
 import random
+import sqlite3
+from collections import defaultdict
+from datetime import datetime, timezone
+from email.utils import format_datetime
 from typing import Tuple, Optional
+from urllib.parse import urlparse
 
-import feedparser
 import httpx
 
-from src.main.tools.registry import add_entry, list_feeds, add_feed, get_feed, entry_exists
-from src.main.tools.summarizer import summarize_text, RetryableError, NonRetryableError
-from src.main.tools.rss_feed_utils import parse_feed, register_feed
-
-# Global async lock to serialize SQLite writes across concurrent feed fetches.
-_db_write_lock = asyncio.Lock()
-# Semaphore to ensure only one summarization request runs at a time.
-_summarizer_semaphore = asyncio.Semaphore(1)
+from src.main.tools.registry import (
+    add_entries_bulk, list_feeds, oldest_feeds, upsert_feed, get_feed, existing_entry_urls,
+    get_cached_summary, cache_summary,
+)
+from src.main.tools.summarizer import (
+    summarize_text, summarize_texts, RetryableError, NonRetryableError,
+    MAX_CONCURRENT_REQUESTS, close_session as close_summarizer_session, summary_cache_key,
+)
+from src.main.tools.rss_feed_utils import parse_feed, parse_feed_bytes, register_feed
+
+# Bound the number of summarization requests in flight across all feeds.
+_summarizer_semaphore = asyncio.Semaphore(MAX_CONCURRENT_REQUESTS)
+# Cap the number of feeds processed at once, overall and per host, so large
+# registries don't open thousands of connections or trip server-side 429s.
+_fetch_semaphore = asyncio.Semaphore(64)
+_host_semaphores: defaultdict[str, asyncio.Semaphore] = defaultdict(lambda: asyncio.Semaphore(4))
+# Feeds currently being processed; concurrent requests for the same URL await
+# the running task instead of fetching, parsing and summarizing it again.
+_inflight: dict[str, asyncio.Task[int]] = {}
 
 logger = logging.getLogger(__name__)
+# Headers sent with every feed request; set once on the shared client so only
+# the conditional-GET headers vary per request.
+_BASE_HEADERS = {
+    "User-Agent": "FeedQuest/0.1",
+    "Accept": "application/rss+xml, application/atom+xml, application/xml;q=0.9, */*;q=0.5",
+    "Accept-Encoding": "gzip, br",
+}
+# Upper bound on a feed body; larger responses are abandoned mid-download.
+_MAX_FEED_BYTES = 16 * 1024 * 1024
 # Reusable async HTTP client for all feed fetches
 _http_client: httpx.AsyncClient | None = None
 
 async def _get_http_client() -> httpx.AsyncClient:
-    """Get or create the shared async HTTP client."""
+    """Get or create the shared async HTTP client.
+
+    The client keeps connections alive across feeds and negotiates HTTP/2 so
+    feeds served from the same host/CDN multiplex over one connection.
+    """
     global _http_client
     if _http_client is None:
-        _http_client = httpx.AsyncClient()
+        _http_client = httpx.AsyncClient(
+            http2=True,
+            limits=httpx.Limits(
+                max_connections=256,
+                max_keepalive_connections=64,
+                keepalive_expiry=30,
+            ),
+            timeout=httpx.Timeout(10.0, connect=5.0),
+            headers=_BASE_HEADERS,
+        )
     return _http_client
 
-async def _async_fetch(url: str, client: httpx.AsyncClient, *, etag: str | None = None, last_modified: str | None = None) -> httpx.Response:
+async def close_http_client() -> None:
+    """Close the shared HTTP client (call on application shutdown)."""
+    global _http_client
+    if _http_client is not None:
+        await _http_client.aclose()
+        _http_client = None
+
+def _http_date(ts: str) -> str | None:
+    """Convert a stored ``last_modified`` value to an RFC 7231 HTTP-date.
+
+    The registry stores ISO 8601 UTC timestamps (``2025-10-06T09:30:00Z``),
+    which servers do not accept in ``If-Modified-Since``.  Returns ``None``
+    when *ts* cannot be parsed so the header is simply left out.
+    """
+    try:
+        dt = datetime.fromisoformat(ts.replace("Z", "+00:00"))
+    except ValueError:
+        return None
+    if dt.tzinfo is None:
+        dt = dt.replace(tzinfo=timezone.utc)
+    return format_datetime(dt.astimezone(timezone.utc), usegmt=True)
+
+async def _async_fetch(url: str, client: httpx.AsyncClient, *, etag: str | None = None, last_modified: str | None = None) -> tuple[httpx.Response, bytes]:
     """Fetch a feed asynchronously with conditional headers.
 
     ``etag`` and ``last_modified`` are optional values taken from the ``feeds``
     table. They are sent as ``If-None-Match`` and ``If-Modified-Since`` to allow
     the server to return a ``304`` when the feed has not changed.
+
+    Returns the response together with its body.  The body is streamed and the
+    download is aborted with ``ValueError`` once it exceeds ``_MAX_FEED_BYTES``,
+    so a huge or hostile feed cannot balloon memory.
     """
-    headers: dict[str, str] = {}
-    if etag:
-        headers["If-None-Match"] = etag
-    if last_modified:
-        headers["If-Modified-Since"] = last_modified
-    resp = await client.get(url, timeout=10.0, headers=headers)
-    # ``raise_for_status`` will raise on 4xx/5xx *except* 304 which is a valid
-    # 'not modified' response.
-    if resp.status_code != 304:
+    headers: dict[str, str] | None = None
+    if etag or last_modified:
+        headers = {}
+        if etag:
+            headers["If-None-Match"] = etag
+        if last_modified and (since := _http_date(last_modified)):
+            headers["If-Modified-Since"] = since
+    async with client.stream("GET", url, headers=headers) as resp:
+        # ``raise_for_status`` will raise on 4xx/5xx *except* 304 which is a valid
+        # 'not modified' response.
+        if resp.status_code == 304:
+            return resp, b""
         resp.raise_for_status()
-    return resp
-
-async def _process_feed(feed_url: str, _: None = None) -> int:
+        declared = resp.headers.get("Content-Length", "")
+        if declared.isdigit() and int(declared) > _MAX_FEED_BYTES:
+            raise ValueError(f"Feed is too large ({declared} bytes)")
+        body = bytearray()
+        async for chunk in resp.aiter_bytes():
+            body += chunk
+            if len(body) > _MAX_FEED_BYTES:
+                raise ValueError(f"Feed exceeds {_MAX_FEED_BYTES} bytes")
+    return resp, bytes(body)
+
+def _parse_entries(content: bytes, url: str, headers: httpx.Headers) -> list[dict]:
+    """Parse raw feed bytes into the entry dicts produced by ``parse_feed``."""
+    return parse_feed(parse_feed_bytes(content, url, headers))
+
+async def _process_feed(feed_url: str, stored: Optional[dict] = None) -> int:
     """Fetch a feed asynchronously and store any new entries.
 
-    The ``_: None`` placeholder keeps the signature compatible with the previous
-    implementation that accepted a client; it is ignored.
+    Concurrent calls for the same ``feed_url`` share a single run.  At most 64
+    feeds, and 4 per host, are processed concurrently; see ``_fetch_and_store``
+    for the actual work.
+    """
+    task = _inflight.get(feed_url)
+    if task is None:
+        task = asyncio.create_task(_process_feed_bounded(feed_url, stored))
+        _inflight[feed_url] = task
+        task.add_done_callback(lambda _: _inflight.pop(feed_url, None))
+    # Shield so one cancelled caller does not cancel the run shared with others.
+    return await asyncio.shield(task)
+
+async def _process_feed_bounded(feed_url: str, stored: Optional[dict]) -> int:
+    """Run ``_fetch_and_store`` within the global and per-host limits."""
+    # Take the per-host slot first so feeds queued behind a busy host do not
+    # hold global slots while they wait.
+    async with _host_semaphores[urlparse(feed_url).netloc], _fetch_semaphore:
+        return await _fetch_and_store(feed_url, stored)
+
+async def _fetch_and_store(feed_url: str, stored: Optional[dict] = None) -> int:
+    """Fetch a single feed and store any new entries.
+
+    ``stored`` is the feed's registry row (as returned by ``list_feeds``).
+    Callers that already hold it pass it in so the etag/last_modified lookup
+    does not cost another query per feed; otherwise it is fetched here.
     """
-    # Retrieve stored etag/last_modified for conditional GET (avoid N+1 query).
-
     etag = None
     last_modified = None
-    stored = get_feed(feed_url)
+    # Registry helpers use blocking sqlite3/requests calls, so run them in a
+    # worker thread to keep the event loop free for other in-flight feeds.
+    if stored is None:
+        stored = await asyncio.to_thread(get_feed, feed_url)
     if not stored:
         logger.warning("Feed %s not found in registry", feed_url)
-        feed_url = register_feed(feed_url)
+        feed_url = await asyncio.to_thread(register_feed, feed_url)
         logger.info(stored)
     else:
         etag = stored.get("etag")
@@ -77,21 +180,36 @@ async def _process_feed(feed_url: str, _: None = None) -> int:
 
     try:
         client = await _get_http_client()
-        response = await _async_fetch(
+        response, body = await _async_fetch(
             feed_url, client, etag=etag, last_modified=last_modified
         )
     except Exception as exc:
         logger.error("Error fetching feed %s: %s", feed_url, exc)
         return 0
 
-    # 304 means no new content.
+    # 304 means no new content.  Still record the visit: ``fetch_batch`` picks
+    # the feeds with the oldest ``last_modified``, and without the bump it would
+    # keep choosing the same unchanged feeds.
     if response.status_code == 304:
+        await _update_feed_metadata(feed_url, response, None)
         return 0
 
-    # Parse the feed content safely using feedparser directly.
+    # Some servers ignore conditional headers and resend an identical body.
+    # Compare a hash of the payload with the one stored on the last run and
+    # skip the parse/summarize/insert work when nothing changed.
+    content_hash = hashlib.sha256(body).hexdigest()
+    if stored and stored.get("content_hash") == content_hash:
+        logger.info("Feed %s unchanged since last fetch, skipping parse", feed_url)
+        await _update_feed_metadata(feed_url, response, content_hash)
+        return 0
+
+    # Parse the feed content safely using feedparser directly.  Parsing and the
+    # HTML clean-up in ``parse_feed`` are CPU-heavy pure Python, so run them in a
+    # worker thread rather than stalling every other in-flight fetch.
     try:
-        feed_response = feedparser.parse(response.content)
-        parsed = parse_feed(feed_response)
+        parsed = await asyncio.to_thread(
+            _parse_entries, body, str(response.url), response.headers
+        )
     except Exception as exc:
         logger.error("Failed to parse feed %s: %s", feed_url, exc)
         return 0
@@ -102,64 +220,47 @@ async def _process_feed(feed_url: str, _: None = None) -> int:
 
     # Limit to the 3 most recent entries to respect API rate limits.
     entries = parsed[:3]
-    added = 0
+    # Look up which entries are already stored with a single query so we don't
+    # pay for summarizing them again; the insert itself is INSERT OR IGNORE.
+    known_urls = await asyncio.to_thread(
+        existing_entry_urls, [e.get("link") for e in entries]
+    )
+    candidates: list[tuple[dict, str]] = []
     for entry in entries:
         entry_url = entry.get("link")
-        print("Processing entry: %s", entry.get("title") or entry_url)
-        
+        logger.debug("Processing entry: %s", entry.get("title") or entry_url)
+
         # Skip if entry already exists in database
-        if entry_url and entry_exists(entry_url):
+        if entry_url in known_urls:
             logger.info("Entry already exists, skipping: %s", entry_url)
             continue
         
+        # Determine text to summarise – prefer full content if available.
+        feed_content = None
+        if entry.get("content"):
+            # ``content`` can be a list of dicts with ``value``.
+            first = entry.get("content")
+            if isinstance(first, list) and first:
+                feed_content = first[0].get("value")
+            else:
+                feed_content = str(first)
+        elif entry.get("summary"):
+            feed_content = entry.get("summary")
+        if feed_content:
+            candidates.append((entry, feed_content))
+
+    summaries = await _summarize_entries(feed_url, [c for _, c in candidates])
+
+    rows: list[dict] = []
+    # Whether every candidate entry made it into the database; only then may the
+    # body hash be stored, or skipped entries would never be retried.
+    complete = True
+    for (entry, _), ai_summary in zip(candidates, summaries):
         try:
-            # Determine text to summarise – prefer full content if available.
-            feed_content = None
-            if entry.get("content"):
-                # ``content`` can be a list of dicts with ``value``.
-                first = entry.get("content")
-                if isinstance(first, list) and first:
-                    feed_content = first[0].get("value")
-                else:
-                    feed_content = str(first)
-            elif entry.get("summary"):
-                feed_content = entry.get("summary")
-            if not feed_content:
-                continue
-            logger.info("Summarizing entry from %s: %s %s",
-                        feed_url, entry.get("link"), entry.get("title") or "No title")
-            # Summarize the content with limited concurrency.
-            # Note: Rate limiting is built into the summarizer; we don't retry on 429
-            # since it means we're hitting the API limit and retrying will just waste quota.
-            ai_summary = {"summary": "", "ai_tags": []}
-            try:
-                async with _summarizer_semaphore:
-                    ai_summary = await summarize_text(feed_content)
-            except NonRetryableError as exc:
-                # Don't retry on auth, validation, or format errors
-                logger.warning(
-                    "Non-retryable error summarizing entry from %s: %s",
-                    feed_url,
-                    exc,
-                )
-            except RetryableError as exc:
-                # Rate limits: skip entry since retrying wastes quota
-                # Other transient errors: could add retry logic here if needed
-                logger.warning(
-                    "Retryable error (skipping) for %s: %s",
-                    feed_url,
-                    exc,
-                )
-            except Exception as exc:  # pragma: no cover – unexpected errors
-                logger.error(
-                    "Unexpected error summarizing entry from %s: %s",
-                    feed_url,
-                    exc,
-                )
-
             # Skip entry if no summary was obtained (rate limit hit)
             if not ai_summary.get("summary"):
                 logger.warning("Skipping entry from %s due to empty summary: %s", feed_url, entry.get("title") or entry.get("link"))
+                complete = False
                 continue
 
             # Convert feedparser tag dicts to a plain list of strings.
@@ -174,35 +275,164 @@ async def _process_feed(feed_url: str, _: None = None) -> int:
             else:
                 tags = []
 
-            # Serialize DB writes to avoid SQLite "database is locked" errors.
-            async with _db_write_lock:
-                result = add_entry(
-                    feed_url=feed_url,
-                    title=entry.get("title"),
-                    url=entry.get("link"),
-                    published=entry.get("published"),
-                    content=entry.get("content"),
-                    summary=entry.get("summary"),
-                    tags=tags,
-                    ai_summary=ai_summary.get("summary"),
-                    ai_tags=ai_summary.get("ai_tags"),
-                )
-            if result is not None:
-                added += 1
+            rows.append({
+                "title": entry.get("title"),
+                "url": entry.get("link"),
+                "published": entry.get("published"),
+                "content": entry.get("content"),
+                "summary": entry.get("summary"),
+                "tags": tags,
+                "ai_summary": ai_summary.get("summary"),
+                "ai_tags": ai_summary.get("ai_tags"),
+            })
         except Exception as exc:
-            logger.error("Failed to store entry from %s: %s", feed_url, exc)
+            logger.error("Failed to process entry from %s: %s", feed_url, exc)
+            complete = False
             continue
 
+    # Store all new entries of this feed in one transaction.
+    added = 0
+    if rows:
+        try:
+            added = await _with_retry(add_entries_bulk, feed_url, rows)
+        except Exception as exc:
+            logger.error("Failed to store entries from %s: %s", feed_url, exc)
+            complete = False
+
     # Always update feed metadata, even if no new entries were added.
     # This prevents fetching the same feed repeatedly if all entries are duplicates.
-    # Update last_modified to current time to track when we last processed this feed.
-    from datetime import datetime, timezone
+    await _update_feed_metadata(feed_url, response, content_hash if complete else None)
+
+    return added
+
+async def _summarize_entries(feed_url: str, contents: list[str]) -> list[dict]:
+    """Return one summary dict per item of *contents*, in order.
+
+    Identical content (reposts, feeds mirrored by aggregators) is summarized
+    once: cached summaries are reused without touching the semaphore or the
+    rate limiter.  The remaining texts are sent to the model in a single
+    batched request, falling back to one request per text if that fails.
+    """
+    if not contents:
+        return []
+    hashes = [summary_cache_key(c) for c in contents]
+    results: list[Optional[dict]] = list(await asyncio.gather(
+        *(asyncio.to_thread(get_cached_summary, h) for h in hashes)
+    ))
+    # First index of each distinct uncached text; duplicates share its summary.
+    missing: dict[str, int] = {}
+    for i, r in enumerate(results):
+        if r is None:
+            missing.setdefault(hashes[i], i)
+    if not missing:
+        logger.info("Using cached summaries for all entries of %s", feed_url)
+        return results
+
+    logger.info("Summarizing %d entries from %s", len(missing), feed_url)
+    fresh = await _summarize_batch(feed_url, [contents[i] for i in missing.values()])
+    by_hash = dict(zip(missing, fresh))
+    for content_hash, ai_summary in by_hash.items():
+        if ai_summary.get("summary"):
+            await asyncio.to_thread(
+                cache_summary, content_hash, ai_summary["summary"], ai_summary.get("ai_tags")
+            )
+    return [r if r is not None else by_hash[h] for r, h in zip(results, hashes)]
+
+async def _summarize_batch(feed_url: str, contents: list[str]) -> list[dict]:
+    """Summarize *contents* in one request, or per text if batching fails.
+
+    Only a malformed batched reply (``NonRetryableError``, e.g. a truncated or
+    wrong-length result list) falls back to per-text calls; those run
+    concurrently, still bounded by the summarizer semaphore and rate limiter.
+    A rate limit or transient error returns empty summaries instead, since
+    more requests would only spend quota the provider says is used up.
+    """
+    if len(contents) > 1:
+        try:
+            async with _summarizer_semaphore:
+                return await summarize_texts(contents)
+        except NonRetryableError as exc:
+            logger.warning(
+                "Batched summarization failed for %s, falling back to per-entry calls: %s",
+                feed_url,
+                exc,
+            )
+        except Exception as exc:
+            logger.warning("Skipping summaries for %s after batch error: %s", feed_url, exc)
+            return [{"summary": "", "ai_tags": []} for _ in contents]
+    return list(await asyncio.gather(*(_summarize(feed_url, c) for c in contents)))
+
+async def _summarize(feed_url: str, feed_content: str) -> dict:
+    """Summarize *feed_content* with limited concurrency.
+
+    Returns an empty summary when the call fails; errors are logged.
+    Note: Rate limiting is built into the summarizer; we don't retry on 429
+    since it means we're hitting the API limit and retrying will just waste quota.
+    """
+    try:
+        async with _summarizer_semaphore:
+            return await summarize_text(feed_content)
+    except NonRetryableError as exc:
+        # Don't retry on auth, validation, or format errors
+        logger.warning(
+            "Non-retryable error summarizing entry from %s: %s",
+            feed_url,
+            exc,
+        )
+    except RetryableError as exc:
+        # Rate limits: skip entry since retrying wastes quota
+        # Other transient errors: could add retry logic here if needed
+        logger.warning(
+            "Retryable error (skipping) for %s: %s",
+            feed_url,
+            exc,
+        )
+    except Exception as exc:  # pragma: no cover – unexpected errors
+        logger.error(
+            "Unexpected error summarizing entry from %s: %s",
+            feed_url,
+            exc,
+        )
+    return {"summary": "", "ai_tags": []}
+
+async def _update_feed_metadata(
+    feed_url: str, response: httpx.Response, content_hash: Optional[str]
+) -> None:
+    """Persist the response's ETag and body hash for *feed_url*.
+
+    ``last_modified`` is set to the current time to track when we last
+    processed this feed; ``fetch_batch`` relies on it to pick the oldest feeds.
+    A ``content_hash`` of ``None`` keeps the stored hash.
+    """
     new_etag = response.headers.get("ETag")
     now_iso = datetime.now(timezone.utc).isoformat().replace("+00:00", "Z")
-    async with _db_write_lock:
-        add_feed({"url": feed_url, "etag": new_etag, "last_modified": now_iso})
+    try:
+        await _with_retry(
+            upsert_feed,
+            {
+                "url": feed_url,
+                "etag": new_etag,
+                "last_modified": now_iso,
+                "content_hash": content_hash,
+            },
+        )
+    except sqlite3.Error as exc:
+        logger.error("Failed to update metadata for %s: %s", feed_url, exc)
 
-    return added
+async def _with_retry(func, *args, attempts: int = 5):
+    """Run the blocking DB write *func* in a worker thread, retrying on lock errors.
+
+    WAL and ``busy_timeout`` let concurrent writers wait inside SQLite, so no
+    process-wide lock is needed; if a writer still gives up with "database is
+    locked" it is retried with jittered exponential backoff.
+    """
+    for attempt in range(attempts):
+        try:
+            return await asyncio.to_thread(func, *args)
+        except sqlite3.OperationalError as exc:
+            if "locked" not in str(exc) or attempt == attempts - 1:
+                raise
+            await asyncio.sleep(0.01 * 2 ** attempt * (1 + random.random()))
 
 async def fetch_batch(feed_urls: Optional[list[str]]) -> Tuple[int, int]:
     """Fetch entries for a batch of feed URLs sequentially.
@@ -213,32 +443,32 @@ async def fetch_batch(feed_urls: Optional[list[str]]) -> Tuple[int, int]:
     Note: Feeds are processed sequentially (not concurrently) to respect rate limits.
     Feeds are sorted by last_modified (when we last processed them), oldest first.
     """
-    if not feed_urls:
-        all_feeds = list_feeds()
-        # Sort by when we last processed the feed (last_modified timestamp), oldest first
-        all_feeds.sort(key=lambda f: f.get("last_modified", ""))
-        feed_urls = [f["url"] for f in all_feeds[:2]]
+    if feed_urls:
+        batch: list[tuple[str, Optional[dict]]] = [(url, None) for url in feed_urls]
+    else:
+        # Oldest by when we last processed the feed (last_modified timestamp).
+        batch = [(f["url"], f) for f in await asyncio.to_thread(oldest_feeds, 2)]
     
     total_added = 0
-    for url in feed_urls:
-        result = await _process_feed(url)
+    for url, stored in batch:
+        result = await _process_feed(url, stored)
         if isinstance(result, int):
             total_added += result
     
-    return len(feed_urls), total_added
+    return len(batch), total_added
 
 async def fetch_all_entries() -> Tuple[int, int]:
     """Fetch entries for every registered feed concurrently.
 
     Returns a ``(feeds_processed, total_entries_added)`` tuple.
     """
-    feeds = list_feeds()
+    feeds = await asyncio.to_thread(list_feeds)
     tasks = []
     for feed in feeds:
         url = feed.get("url")
         if not url:
             continue
-        tasks.append(_process_feed(url))
+        tasks.append(_process_feed(url, feed))
     results = await asyncio.gather(*tasks, return_exceptions=True)
     total_added = sum(r if isinstance(r, int) else 0 for r in results)
     return len(feeds), total_added
@@ -257,6 +487,8 @@ if __name__ == "__main__":
 
     async def main():
         added = await fetch_batch(None)
+        await close_http_client()
+        await close_summarizer_session()
         print(f"added {added[1]} new entries from {added[0]} feeds")
 
     asyncio.run(main())
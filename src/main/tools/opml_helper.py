@@ -1,7 +1,11 @@
+import asyncio
+import logging
+from typing import Iterator
 from xml.etree import ElementTree
 import sys
 import os
 import pathlib
+
 # Ensure the repository root is on ``sys.path`` so absolute imports of the
 # ``src`` package work when this file is executed directly (e.g. ``python
 # src/main/tools/opml_helper.py``).
@@ -12,8 +16,36 @@ if str(repo_root) not in sys.path:
     sys.path.insert(0, str(repo_root))
 
 # Import using the full package path – now safe after adjusting ``sys.path``.
-from src.main.tools.rss_feed_utils import find_rss_feed
-from src.main.tools.registry import add_feed
+from src.main.tools.rss_feed_utils import find_rss_feeds_many
+from src.main.tools.registry import add_feeds_bulk
+
+logger = logging.getLogger(__name__)
+
+def iter_opml(file_path: str) -> Iterator[dict[str, str]]:
+    """Yield the feed information of each ``<outline>`` in an OPML file.
+
+    The document is streamed: attributes are read when an ``<outline>`` opens
+    (keeping document order) and every element is detached from its parent as
+    soon as it ends, so memory stays flat however many feeds the export
+    contains.
+    """
+    # Currently open elements; the last one is the parent of the next start.
+    stack: list[ElementTree.Element] = []
+    for event, elem in ElementTree.iterparse(file_path, events=("start", "end")):
+        if event == "start":
+            stack.append(elem)
+            if elem.tag == "outline":
+                yield {
+                    "text": elem.get("text", ""),
+                    "type": elem.get("type", ""),
+                    "xmlUrl": elem.get("xmlUrl", ""),
+                    "htmlUrl": elem.get("htmlUrl", "")
+                }
+        else:
+            stack.pop()
+            if stack:
+                stack[-1].remove(elem)
+
 def parse_opml(file_path: str) -> list[dict[str]]:
     """Parse an OPML file and extract feed information.
 
@@ -25,35 +57,27 @@ def parse_opml(file_path: str) -> list[dict[str]]:
     -------
     list[dict[str]]:
     A list of dictionaries containing feed information."""
-    feeds = []
-    with open(file_path, "rt", encoding="utf-8") as f:
-        tree = ElementTree.parse(f)
-    for outline in tree.findall(".//outline"):
-        feed_info = {
-            "text": outline.attrib.get("text", ""),
-            "type": outline.attrib.get("type", ""),
-            "xmlUrl": outline.attrib.get("xmlUrl", ""),
-            "htmlUrl": outline.attrib.get("htmlUrl", "")
-        }
-        feeds.append(feed_info)
-
-    return feeds
+    return list(iter_opml(file_path))
 
 if __name__ == "__main__":
     if len(sys.argv) != 2:
         print("Usage: python opml_helper.py <path_to_opml_file>")
         sys.exit(1)
 
+    logging.basicConfig(level=logging.INFO, format="%(message)s")
     opml_file = sys.argv[1]
-    feed_list = parse_opml(opml_file)
-    for feed in feed_list:
-        url = feed.get("htmlUrl", "")
-        print(url)
-        if url:
-            feed_url = find_rss_feed(url)
-            if feed_url:
-                added = add_feed(feed_url)
-                status = "registered" if added else "already registered"
-                print(f"Feed {status}: {feed_url}")
-            else:
-                print(f"No RSS/Atom feed found for {url}.")
+    # dict.fromkeys drops repeated sites while keeping document order.
+    site_urls = list(dict.fromkeys(
+        feed["htmlUrl"] for feed in iter_opml(opml_file) if feed.get("htmlUrl")
+    ))
+    results = asyncio.run(find_rss_feeds_many(site_urls, concurrency=32))
+    discovered = []
+    for url, feed_info in zip(site_urls, results):
+        if feed_info:
+            logger.info("Found feed: %s", feed_info["url"])
+            discovered.append(feed_info)
+        else:
+            logger.info("No RSS/Atom feed found for %s.", url)
+    # Register everything in one transaction instead of one commit per feed.
+    added = add_feeds_bulk(discovered)
+    print(f"Registered {added} new feeds ({len(discovered) - added} already registered).")
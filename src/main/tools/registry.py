@@ -4,50 +4,70 @@ The low‑level SQLite connection and schema creation lives in ``src/main/tools/
 This module offers convenient helpers for the application layer:
 
 * ``add_feed`` / ``list_feeds`` – manage RSS source URLs.
+* ``upsert_feed`` – ``add_feed`` that raises database errors, for callers that retry.
+* ``add_feeds_bulk`` – register many feeds (e.g. an OPML import) in one transaction.
 * ``add_entry`` – store a parsed article belonging to a feed.
+* ``add_entries_bulk`` – store several articles of one feed in one transaction.
 * ``add_embedding`` – optional dense vector for semantic search.
+* ``get_cached_summary`` / ``cache_summary`` – LLM summaries keyed by content hash.
 
 All functions operate on the single SQLite file ``src/feeds.db``; the schema is
-defined in ``db_schema.sql`` and initialised by ``db.init_schema()`` on import.
+defined in ``db_schema.sql`` and initialised by ``db.init_schema()`` the first
+time a connection is requested.
 """
 
 from __future__ import annotations
 
+import json
 import os
-import re
+import sqlite3
+import time
 from datetime import datetime, timezone
+from functools import lru_cache
 from typing import List, Optional, Dict, Union
 
 # Re‑use the DB utilities that now own connection handling and schema init.
-from src.main.db import get_connection, init_schema
-
-# Pre-compiled timestamp format pattern for efficiency
-_TS_FORMAT_PATTERN = re.compile(r'%a, %d %b %Y %H:%M:%S %Z')
-
-def _init_db() -> None:
-    init_schema()
-
-# Run once when the module is imported.
-_init_db()
-
-_CACHED_TIMESTAMPS: Dict[str, str] = {}
+from src.main.db import get_connection
+
+# Month abbreviations used by RFC 822 dates (``Mon, 06 Oct 2025 09:30:00 GMT``).
+_MONTHS = {
+    "Jan": 1, "Feb": 2, "Mar": 3, "Apr": 4, "May": 5, "Jun": 6,
+    "Jul": 7, "Aug": 8, "Sep": 9, "Oct": 10, "Nov": 11, "Dec": 12,
+}
+_RFC822_FORMAT = "%a, %d %b %Y %H:%M:%S %Z"
+
+def _utc_now_iso() -> str:
+    """Return the current UTC time as ``YYYY-MM-DDTHH:MM:SSZ``."""
+    return time.strftime("%Y-%m-%dT%H:%M:%SZ", time.gmtime())
+
+@lru_cache(maxsize=4096)
+def _rfc822_to_iso(ts: str) -> str:
+    """Convert an RFC 822 date in GMT/UTC to ``YYYY-MM-DDTHH:MM:SSZ``.
+
+    The common form is split and its fields handed to ``datetime`` directly
+    (which still validates them), far cheaper than ``strptime``; anything else
+    goes through ``strptime``.  Raises ``ValueError`` for unparseable input
+    (exceptions are not cached).
+    """
+    try:
+        _, day, month, year, clock, zone = ts.split()
+        hh, mm, ss = clock.split(":")
+        if zone not in ("GMT", "UTC") or len(year) != 4:
+            raise ValueError(ts)
+        dt = datetime(int(year), _MONTHS[month], int(day), int(hh), int(mm), int(ss))
+        return dt.isoformat() + "Z"
+    except (ValueError, KeyError):
+        dt = datetime.strptime(ts, _RFC822_FORMAT)
+        return dt.astimezone(timezone.utc).isoformat(timespec="seconds").replace("+00:00", "Z")
 
 def _normalize_timestamp(ts: str) -> str:
-    """Normalize timestamp to ISO 8601 UTC format with caching."""
-    if not ts:
-        dt = datetime.now(timezone.utc)
-    else:
-        # Check cache first
-        if ts in _CACHED_TIMESTAMPS:
-            return _CACHED_TIMESTAMPS[ts]
+    """Normalize timestamp to ISO 8601 UTC format, falling back to now."""
+    if ts:
         try:
-            dt = datetime.strptime(ts, '%a, %d %b %Y %H:%M:%S %Z')
+            return _rfc822_to_iso(ts)
         except ValueError:
-            dt = datetime.now(timezone.utc)
-    result = dt.astimezone(timezone.utc).isoformat(timespec="seconds").replace("+00:00", "Z")
-    if ts:
-        _CACHED_TIMESTAMPS[ts] = result
-    return result
+            pass
+    return _utc_now_iso()
 
 def add_feed(
     feed_info: dict[str, str]
@@ -55,9 +75,24 @@ def add_feed(
     """Insert a new feed URL or update its metadata.
 
     ``feed_info`` must contain at least a ``url`` key. Optional keys are
-    ``title``, ``etag`` and ``last_modified``. Missing values are ignored.
+    ``title``, ``etag``, ``last_modified`` and ``content_hash`` (SHA-256 of the
+    last fetched body). Missing values are ignored.
     The function is idempotent – it inserts a row if the URL does not exist or
     updates the supplied metadata fields for an existing entry.
+    Returns ``False`` on any failure; use ``upsert_feed`` to see the error.
+    """
+    try:
+        return upsert_feed(feed_info)
+    except Exception:
+        return False
+
+
+def upsert_feed(feed_info: dict[str, str]) -> bool:
+    """Like ``add_feed`` but let database errors propagate.
+
+    Callers that retry on "database is locked" (the fetcher's metadata
+    updates) use this so the ``sqlite3.OperationalError`` reaches them.
+    Returns ``False`` only when ``feed_info`` has no URL.
     """
     feed_url = (feed_info.get("url", "") or "").strip()
     if not feed_url:
@@ -66,72 +101,93 @@ def add_feed(
     title = feed_info.get("title")
     etag = feed_info.get("etag")
     last_modified = _normalize_timestamp(feed_info.get("last_modified"))
+    content_hash = feed_info.get("content_hash")
 
-    ts = datetime.now(timezone.utc).isoformat(timespec="seconds").replace("+00:00", "Z")
+    ts = _utc_now_iso()
+    with get_connection() as conn:
+        cur = conn.cursor()
+        # One fixed upsert statement, so SQLite prepares it once and reuses
+        # it; ``COALESCE`` keeps the stored value for any field not supplied.
+        cur.execute(
+            "INSERT INTO feeds (url, added, title, etag, last_modified, content_hash) "
+            "VALUES (?, ?, ?, ?, ?, ?) "
+            "ON CONFLICT(url) DO UPDATE SET "
+            "title = COALESCE(excluded.title, title), "
+            "etag = COALESCE(excluded.etag, etag), "
+            "last_modified = COALESCE(excluded.last_modified, last_modified), "
+            "content_hash = COALESCE(excluded.content_hash, content_hash)",
+            (feed_url, ts, title, etag, last_modified or ts, content_hash),
+        )
+        conn.commit()
+        return True
+
+
+def add_feeds_bulk(feeds: List[Dict[str, str]]) -> int:
+    """Insert many feeds in a single statement.
+
+    Each item takes the same keys as ``add_feed``.  Existing URLs are left
+    untouched (``INSERT OR IGNORE``), which suits bulk imports such as OPML
+    files.  Returns the number of feeds actually inserted.
+
+    The rows are sent as one JSON array and expanded by ``json_each`` inside
+    SQLite, so the whole import is one prepared statement with one binding
+    instead of a round trip per row.
+    """
+    rows = [
+        (
+            url, f.get("title"), f.get("etag"),
+            _normalize_timestamp(f.get("last_modified")), f.get("content_hash"),
+        )
+        for f in feeds
+        if (url := (f.get("url", "") or "").strip())
+    ]
+    if not rows:
+        return 0
     try:
         with get_connection() as conn:
             cur = conn.cursor()
-            # Insert with IGNORE – if the URL exists we will update missing metadata.
             cur.execute(
-                "INSERT OR IGNORE INTO feeds (url, added, title, etag, last_modified) "
-                "VALUES (?, ?, ?, ?, ?)",
-                (feed_url, ts, title, etag, last_modified or ts),
+                "INSERT OR IGNORE INTO feeds (url, added, title, etag, last_modified, content_hash) "
+                "SELECT json_extract(value, '$[0]'), ?, json_extract(value, '$[1]'), "
+                "json_extract(value, '$[2]'), json_extract(value, '$[3]'), "
+                "json_extract(value, '$[4]') "
+                "FROM json_each(?)",
+                (_utc_now_iso(), json.dumps(rows, separators=(",", ":"))),
             )
-            inserted = cur.rowcount
-
-            # If the row already existed, apply any provided metadata updates.
-            if inserted == 0:
-                updates = []
-                params: list = []
-                if title is not None:
-                    updates.append("title = ?")
-                    params.append(title)
-                if etag is not None:
-                    updates.append("etag = ?")
-                    params.append(etag)
-                if last_modified is not None:
-                    updates.append("last_modified = ?")
-                    params.append(last_modified)
-                if updates:
-                    params.append(feed_url)
-                    cur.execute(
-                        f"UPDATE feeds SET {', '.join(updates)} WHERE url = ?",
-                        tuple(params),
-                    )
-                    conn.commit()
-                    return True
-
             conn.commit()
-            return inserted == 1 or inserted == 0
+            return cur.rowcount
     except Exception:
-        return False
+        return 0
+
+
+def _rows_to_dicts(
+    cur: sqlite3.Cursor, rows: List[tuple], keep: tuple[str, ...] = ("url", "added")
+) -> List[Dict[str, str]]:
+    """Map *rows* of *cur*'s result to dicts keyed by column name.
+
+    Columns in *keep* are always present; other columns are omitted when
+    empty, matching the shape the registry helpers have always returned.
+    """
+    cols = [d[0] for d in cur.description]
+    return [{k: v for k, v in zip(cols, row) if v or k in keep} for row in rows]
+
+
+_FEED_COLUMNS = "url, title, etag, last_modified, content_hash, added"
 
 
 def list_feeds() -> List[Dict[str, str]]:
     """Return all stored feeds with their metadata.
 
     The result is a list of dictionaries ordered by insertion time.  Each dict
-    contains the keys ``url``, ``title``, ``etag``, ``last_modified`` and
-    ``added``.  Missing optional values are omitted from the dict.
+    contains the keys ``url``, ``title``, ``etag``, ``last_modified``,
+    ``content_hash`` and ``added``.  Missing optional values are omitted from
+    the dict.
     """
     try:
         with get_connection() as conn:
             cur = conn.cursor()
-            cur.execute(
-                "SELECT url, title, etag, last_modified, added FROM feeds ORDER BY rowid"
-            )
-            rows = cur.fetchall()
-            feeds: List[Dict[str, str]] = []
-            for url, title, etag, last_modified, added in rows:
-                entry: Dict[str, str] = {"url": url, "added": added}
-                if title:
-                    entry["title"] = title
-                if etag:
-                    entry["etag"] = etag
-                if last_modified:
-                    entry["last_modified"] = last_modified
-                feeds.append(entry)
-            return feeds
+            cur.execute(f"SELECT {_FEED_COLUMNS} FROM feeds ORDER BY rowid")
+            return _rows_to_dicts(cur, cur.fetchall())
     except Exception:
         return []
 
@@ -141,25 +197,32 @@ def get_feed(url: str) -> Dict[str, str] | None:
     try:
         with get_connection() as conn:
             cur = conn.cursor()
-            cur.execute(
-                "SELECT url, title, etag, last_modified, added FROM feeds WHERE url = ?"
-                , (url,)
-            )
+            cur.execute(f"SELECT {_FEED_COLUMNS} FROM feeds WHERE url = ?", (url,))
             row = cur.fetchone()
             if not row:
                 return None
-            url, title, etag, last_modified, added = row
-            entry: Dict[str, str] = {"url": url, "added": added}
-            if title:
-                entry["title"] = title
-            if etag:
-                entry["etag"] = etag
-            if last_modified:
-                entry["last_modified"] = last_modified
-            return entry
+            return _rows_to_dicts(cur, [row])[0]
     except Exception:
         return None
 
+def oldest_feeds(limit: int) -> List[Dict[str, str]]:
+    """Return the *limit* feeds with the oldest ``last_modified`` timestamp.
+
+    Feeds never processed (no timestamp) come first.  The ordering is done by
+    SQLite on ``idx_feeds_last_modified`` so only *limit* rows are read.  Each
+    dict has the same shape as the items returned by ``list_feeds``.
+    """
+    try:
+        with get_connection() as conn:
+            cur = conn.cursor()
+            cur.execute(
+                f"SELECT {_FEED_COLUMNS} FROM feeds ORDER BY last_modified ASC LIMIT ?",
+                (limit,),
+            )
+            return _rows_to_dicts(cur, cur.fetchall())
+    except Exception:
+        return []
+
 # ---------------------------------------------------------------------------
 # Entry‑level helpers (articles/posts)
 # ---------------------------------------------------------------------------
@@ -174,37 +237,62 @@ def add_entry(
     Returns the generated ``entries.id`` on success or ``None`` on failure (e.g.,
     unknown feed or duplicate URL).
     """
-    # Resolve the feed id first.
+    ts = _utc_now_iso()
+    tags = ",".join(tags) if tags else None
+    ai_tags = ",".join(ai_tags) if ai_tags else None
+    with get_connection() as conn:
+        cur = conn.cursor()
+        # Resolve the feed id inside the INSERT: an unknown feed selects no row,
+        # so nothing is inserted and ``rowcount`` stays 0.
+        cur.execute(
+            """
+            INSERT OR IGNORE INTO entries (
+                feed_id, title, url, published, content, summary, ai_summary, added, tags, ai_tags
+            )
+            SELECT id, ?, ?, ?, ?, ?, ?, ?, ?, ? FROM feeds WHERE url = ?
+            """,
+            (title, url, published, content, summary, ai_summary, ts, tags, ai_tags, feed_url),
+        )
+        conn.commit()
+        return cur.lastrowid if cur.rowcount else None
+
+
+def add_entries_bulk(feed_url: str, entries: List[Dict[str, object]]) -> int:
+    """Insert several entries linked to *feed_url* in a single transaction.
+
+    Each item of *entries* takes the same keys as the ``add_entry`` keyword
+    arguments.  Duplicate URLs are skipped by ``INSERT OR IGNORE``.  Returns the
+    number of rows actually inserted (``0`` for an unknown feed).
+    """
+    if not entries:
+        return 0
     with get_connection() as conn:
         cur = conn.cursor()
         cur.execute("SELECT id FROM feeds WHERE url = ?", (feed_url,))
         feed_row = cur.fetchone()
         if not feed_row:
-            return None
+            return 0
         feed_id = feed_row[0]
-        ts = datetime.now(timezone.utc).isoformat().replace("+00:00", "Z")
-        if tags:
-            tags = ",".join(tags)
-        else:
-            tags = None
-        if ai_tags:
-            ai_tags = ",".join(ai_tags)
-        else:
-            ai_tags = None
-        try:
-            cur.execute(
-                """
-                INSERT OR IGNORE INTO entries (
-                    feed_id, title, url, published, content, summary, ai_summary, added, tags, ai_tags
-                ) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
-                """,
-                (feed_id, title, url, published, content, summary, ai_summary, ts, tags, ai_tags),
+        ts = _utc_now_iso()
+        rows = [
+            (
+                feed_id, e.get("title"), e.get("url"), e.get("published"),
+                e.get("content"), e.get("summary"), e.get("ai_summary"), ts,
+                ",".join(e["tags"]) if e.get("tags") else None,
+                ",".join(e["ai_tags"]) if e.get("ai_tags") else None,
             )
-            conn.commit()
-            entry_id = cur.lastrowid if cur.rowcount else None
-            return entry_id
-        except Exception:
-            raise
+            for e in entries
+        ]
+        cur.executemany(
+            """
+            INSERT OR IGNORE INTO entries (
+                feed_id, title, url, published, content, summary, ai_summary, added, tags, ai_tags
+            ) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
+            """,
+            rows,
+        )
+        conn.commit()
+        return cur.rowcount
 
 
 def add_embedding(entry_id: int, vector: bytes, model: str = "default") -> bool:
@@ -226,6 +314,44 @@ def add_embedding(entry_id: int, vector: bytes, model: str = "default") -> bool:
         return False
 
 
+def get_cached_summary(content_hash: str) -> Dict[str, Union[str, List[str]]] | None:
+    """Return the cached summary for *content_hash* or ``None`` on a miss.
+
+    The result has the same shape as ``summarize_text``: ``summary`` and
+    ``ai_tags`` keys.
+    """
+    try:
+        with get_connection() as conn:
+            cur = conn.cursor()
+            cur.execute(
+                "SELECT summary, ai_tags FROM summary_cache WHERE hash = ?",
+                (content_hash,),
+            )
+            row = cur.fetchone()
+            if not row:
+                return None
+            summary, ai_tags = row
+            return {"summary": summary, "ai_tags": json.loads(ai_tags) if ai_tags else []}
+    except Exception:
+        return None
+
+
+def cache_summary(content_hash: str, summary: str, ai_tags: Optional[List[str]] = None) -> bool:
+    """Store an LLM *summary* for *content_hash*, replacing any previous value."""
+    try:
+        with get_connection() as conn:
+            cur = conn.cursor()
+            cur.execute(
+                "INSERT OR REPLACE INTO summary_cache (hash, summary, ai_tags, created) "
+                "VALUES (?, ?, ?, ?)",
+                (content_hash, summary, json.dumps(ai_tags or []), time.time()),
+            )
+            conn.commit()
+            return True
+    except Exception:
+        return False
+
+
 def get_entry_by_id(entry_id: int) -> Dict[str, str] | None:
     """Retrieve a single entry by its ID.
 
@@ -244,27 +370,7 @@ def get_entry_by_id(entry_id: int) -> Dict[str, str] | None:
             row = cur.fetchone()
             if not row:
                 return None
-            
-            entry_id, url, title, published, content, summary, tags, ai_summary, ai_tags, added = row
-            entry: Dict[str, str] = {
-                "id": entry_id,
-                "url": url,
-                "title": title,
-                "added": added,
-            }
-            if published:
-                entry["published"] = published
-            if content:
-                entry["content"] = content
-            if summary:
-                entry["summary"] = summary
-            if tags:
-                entry["tags"] = tags
-            if ai_summary:
-                entry["ai_summary"] = ai_summary
-            if ai_tags:
-                entry["ai_tags"] = ai_tags
-            return entry
+            return _rows_to_dicts(cur, [row], keep=("id", "url", "title", "added"))[0]
     except Exception:
         return None
 
@@ -280,30 +386,15 @@ def list_entries_by_feed(feed_url: str, limit: int = 100) -> List[Dict[str, str]
             cur = conn.cursor()
             cur.execute(
                 """
-                SELECT e.id, e.url, e.title, e.published
-                FROM entries e
-                JOIN feeds f ON e.feed_id = f.id
-                WHERE f.url = ?
-                ORDER BY e.published DESC
+                SELECT id, url, title, published
+                FROM entries
+                WHERE feed_id = (SELECT id FROM feeds WHERE url = ?)
+                ORDER BY published DESC
                 LIMIT ?
                 """,
                 (feed_url, limit),
             )
-            rows = cur.fetchall()
-            if not rows:
-                return []
-            
-            entries: List[Dict[str, str]] = []
-            for entry_id, url, title, published in rows:
-                entry: Dict[str, str] = {
-                    "id": entry_id,
-                    "url": url,
-                    "title": title,
-                }
-                if published:
-                    entry["published"] = published
-                entries.append(entry)
-            return entries
+            return _rows_to_dicts(cur, cur.fetchall(), keep=("id", "url", "title"))
     except Exception:
         return []
 
@@ -320,3 +411,22 @@ def entry_exists(entry_url: str) -> bool:
             return cur.fetchone() is not None
     except Exception:
         return False
+
+
+def existing_entry_urls(entry_urls: List[str]) -> set[str]:
+    """Return the subset of *entry_urls* that is already stored.
+
+    One query for the whole list, served by the unique index on
+    ``entries.url``, instead of one ``entry_exists`` call per URL.
+    """
+    urls = [u for u in entry_urls if u]
+    if not urls:
+        return set()
+    try:
+        with get_connection() as conn:
+            cur = conn.cursor()
+            placeholders = ", ".join("?" for _ in urls)
+            cur.execute(f"SELECT url FROM entries WHERE url IN ({placeholders})", urls)
+            return {row[0] for row in cur.fetchall()}
+    except Exception:
+        return set()
@@ -13,18 +13,58 @@ Returns the discovered feed URL and metadata or ``None`` if no feed could be ide
 
 from __future__ import annotations
 
+import asyncio
 import logging
-from typing import Optional, List, Dict
-from urllib.parse import urljoin
+import threading
+import time
+from collections import OrderedDict
+from typing import Iterable, Mapping, Optional, List, Dict
+from urllib.parse import urljoin, urlsplit
 
+import httpx
 import requests
+from requests.adapters import HTTPAdapter
 from bs4 import BeautifulSoup
 import feedparser
 from feedparser import FeedParserDict
+from lxml import etree
+try:
+    from selectolax.lexbor import LexborHTMLParser
+except ImportError:  # pragma: no cover – optional C-accelerated parser
+    LexborHTMLParser = None
+
 from src.main.tools.registry import add_feed
+from src.main.tools.utils import retry_after
 
 logger = logging.getLogger(__name__)
 
+# ``type`` values of a ``<link rel="alternate">`` that points at a feed.
+_FEED_TYPES = frozenset({"application/rss+xml", "application/atom+xml"})
+
+# Sites answering 429 are retried after the ``Retry-After`` delay they ask for,
+# as long as it is no longer than ``_MAX_RETRY_AFTER`` seconds.
+_MAX_RATE_LIMIT_RETRIES = 2
+_MAX_RETRY_AFTER = 30.0
+# Discovery reads at most this much of a page or feed, and ``clean_html`` parses
+# at most ``_MAX_HTML_CHARS`` characters, so one huge or hostile document
+# cannot tie up a worker.
+_MAX_BODY_BYTES = 5 * 1024 * 1024
+_MAX_HTML_CHARS = 1024 * 1024
+
+# Shared session so repeated lookups reuse pooled keep-alive connections (and
+# TLS sessions) instead of opening a new one per request.
+_SESSION = requests.Session()
+_SESSION.headers["User-Agent"] = "RSS-Finder/1.0"
+for _prefix in ("http://", "https://"):
+    _SESSION.mount(_prefix, HTTPAdapter(pool_connections=32, pool_maxsize=32))
+
+# Successful discoveries are remembered for ``_DISCOVERY_TTL`` seconds so that
+# registering the same site again (retries, re-imports) skips the network.
+_DISCOVERY_TTL = 600.0
+_DISCOVERY_CACHE_SIZE = 1024
+_discovery_cache: OrderedDict[str, tuple[float, Dict[str, str]]] = OrderedDict()
+_discovery_lock = threading.Lock()
+
 def register_feed(site_url: str) -> Exception | str:
     """Discover a feed for *site_url* and add it to the registry.
 
@@ -32,7 +72,7 @@ def register_feed(site_url: str) -> Exception | str:
     registry ``add_feed`` accepts the same structure.  A JSON‑compatible result
     with a ``message`` field is returned.
     """
-    feed_info = find_rss_feed(site_url)
+    feed_info = _cached_find_rss_feed(site_url)
     if not feed_info:
         return Exception(f"No feed found for {site_url}")
 
@@ -43,19 +83,140 @@ def register_feed(site_url: str) -> Exception | str:
         return feed_info.get('url', '')
 
 
-def _find_link_tag(soup: BeautifulSoup) -> Optional[str]:
-    """Search ``<link>`` tags for RSS/Atom declarations.
+def _discovery_key(site_url: str) -> str:
+    """Canonical cache key for *site_url*: lower-cased scheme and host, no fragment."""
+    parts = urlsplit(site_url.strip())
+    return parts._replace(
+        scheme=parts.scheme.lower(), netloc=parts.netloc.lower(), fragment=""
+    ).geturl()
+
+def _cached_find_rss_feed(site_url: str) -> Dict[str, str]:
+    """``find_rss_feed`` behind a small thread-safe TTL/LRU cache.
 
-    Returns the first matching ``href`` (already resolved to an absolute URL) or ``None``.
+    Only successful lookups are cached, so a site that was unreachable is
+    tried again on the next call.
     """
-    for link in soup.find_all("link", rel="alternate"):
-        type_attr = (link.get("type") or "").lower()
-        if type_attr in {"application/rss+xml", "application/atom+xml"}:
-            href = link.get("href")
+    key = _discovery_key(site_url)
+    now = time.monotonic()
+    with _discovery_lock:
+        cached = _discovery_cache.get(key)
+        if cached is not None and cached[0] > now:
+            _discovery_cache.move_to_end(key)
+            return dict(cached[1])
+    feed_info = find_rss_feed(site_url)
+    if feed_info:
+        with _discovery_lock:
+            _discovery_cache[key] = (now + _DISCOVERY_TTL, dict(feed_info))
+            _discovery_cache.move_to_end(key)
+            while len(_discovery_cache) > _DISCOVERY_CACHE_SIZE:
+                _discovery_cache.popitem(last=False)
+    return feed_info
+
+def _first_feed_href(links: Iterable[Mapping[str, str]]) -> Optional[str]:
+    """Return the ``href`` of the first RSS/Atom declaration among *links*.
+
+    *links* are the attribute mappings of ``<link rel="alternate">`` tags.
+    """
+    for attrs in links:
+        type_attr = attrs.get("type")
+        if type_attr and type_attr.lower() in _FEED_TYPES:
+            href = attrs.get("href")
             if href:
                 return href
     return None
 
+class _LinkScanner:
+    """Look for a feed ``<link>`` while a page is still downloading.
+
+    Every chunk goes through lxml's ``HTMLPullParser``, which only reports
+    ``<link>`` start tags, so discovery can stop reading as soon as the
+    declaration (usually in ``<head>``) has arrived.  The bytes read so far
+    are kept in ``body``; ``full`` turns true once they reach
+    ``_MAX_BODY_BYTES`` and the caller should stop reading.
+    """
+
+    def __init__(self) -> None:
+        self.body = bytearray()
+        self._parser = etree.HTMLPullParser(events=("start",), tag="link")
+
+    @property
+    def full(self) -> bool:
+        return len(self.body) >= _MAX_BODY_BYTES
+
+    def feed(self, chunk: bytes) -> Optional[str]:
+        """Consume *chunk*; return the feed ``href`` once one has been seen."""
+        self.body += chunk
+        self._parser.feed(chunk)
+        return self._match()
+
+    def finish(self) -> Optional[str]:
+        """Flush the parser after the last chunk (e.g. an unterminated tag)."""
+        try:
+            self._parser.close()
+        except etree.XMLSyntaxError:  # nothing was parsed, e.g. an empty page
+            return None
+        return self._match()
+
+    def _match(self) -> Optional[str]:
+        return _first_feed_href(
+            el.attrib
+            for _, el in self._parser.read_events()
+            if "alternate" in (el.get("rel") or "").lower().split()
+        )
+
+def parse_feed_bytes(body: bytes, url: str, headers: Mapping[str, str]) -> FeedParserDict:
+    """Parse an already downloaded feed *body* with ``feedparser``.
+
+    feedparser is given the response's ``Content-Type`` (for charset
+    detection) and *url* as the base for relative links, so the result matches
+    what ``feedparser.parse(url)`` would produce without a second request.
+    Use ``_is_usable_feed`` rather than ``bozo`` to judge the result: a wrong
+    ``Content-Type`` alone makes feedparser flag an otherwise fine feed.
+    """
+    # Once response headers are given feedparser insists on a Content-Type and
+    # flags the feed as bozo without one, so fall back to the generic XML type
+    # it assumes for plain byte strings.
+    return feedparser.parse(
+        body,
+        response_headers={
+            "content-type": headers.get("Content-Type") or "application/xml",
+            "content-location": url,
+        },
+    )
+
+# Bozo reasons that only concern the response's Content-Type header (not an
+# XML media type, or a charset that disagrees with the document); the feed
+# itself was parsed completely.
+_HEADER_BOZO = (feedparser.NonXMLContentType, feedparser.CharacterEncodingOverride)
+
+def _is_usable_feed(feed: FeedParserDict) -> bool:
+    """Return ``True`` if *feed* has entries and parsed without real errors."""
+    if not feed.entries:
+        return False
+    return not feed.bozo or isinstance(feed.get("bozo_exception"), _HEADER_BOZO)
+
+def _fetch_and_parse(
+    url: str, timeout: float
+) -> tuple[FeedParserDict | None, Mapping[str, str]]:
+    """Download *url* over the shared session and parse it with ``feedparser``.
+
+    Returns the parsed feed and the response headers, or ``(None, {})`` when
+    the request fails.  Handing feedparser the bytes keeps it from opening a
+    connection of its own.  A feed larger than ``_MAX_BODY_BYTES`` is not
+    parsed; only its headers are used.
+    """
+    try:
+        with _SESSION.get(url, timeout=timeout, stream=True) as response:
+            response.raise_for_status()
+            body = response.raw.read(_MAX_BODY_BYTES + 1, decode_content=True)
+    except Exception as exc:  # pragma: no cover – network errors are environment specific
+        logger.error("Failed to fetch feed %s: %s", url, exc)
+        return None, {}
+    if len(body) > _MAX_BODY_BYTES:
+        logger.warning("Feed %s exceeds %d bytes, not parsing it", url, _MAX_BODY_BYTES)
+        body = b""
+    return parse_feed_bytes(body, response.url, response.headers), response.headers
+
 def find_rss_feed(site_url: str, timeout: int = 5) -> Dict[str, str]:
     """Discover an RSS/Atom feed for *site_url* and collect basic metadata.
 
@@ -73,28 +234,33 @@ def find_rss_feed(site_url: str, timeout: int = 5) -> Dict[str, str]:
     """
     feed_url: str | None = None
     parsed_feed = None
+    feed_headers: Mapping[str, str] = {}
+    # 1️⃣ HTML discovery for <link> tags, stopping the download at the first match.
+    # The ``with`` block also releases the pooled connection on HTTP errors.
+    scanner = _LinkScanner()
+    link_href = None
     try:
-        response = requests.get(
-            site_url,
-            timeout=timeout,
-            headers={"User-Agent": "RSS-Finder/1.0"},
-        )
-        response.raise_for_status()
+        with _SESSION.get(site_url, timeout=timeout, stream=True) as response:
+            response.raise_for_status()
+            for chunk in response.iter_content(8192):
+                if (link_href := scanner.feed(chunk)) or scanner.full:
+                    break
+            link_href = link_href or scanner.finish()
     except Exception as exc:  # pragma: no cover – network errors are environment specific
         logger.error("Failed to fetch site %s: %s", site_url, exc)
         return {}
-
-    # 1️⃣ HTML discovery for <link> tags
-    soup = BeautifulSoup(response.text, "html.parser")
-    link_href = _find_link_tag(soup)
     if link_href:
         feed_url = urljoin(response.url, link_href)
         logger.info("Discovered feed via <link>: %s", feed_url)
+    elif scanner.full:
+        logger.warning("Stopped reading %s after %d bytes", site_url, _MAX_BODY_BYTES)
     else:
-        # 2️⃣ Fallback – treat the supplied URL itself as a possible feed
-        # Parse once to check validity, reuse the result
-        parsed_feed = feedparser.parse(site_url)
-        if not parsed_feed.bozo and parsed_feed.entries:
+        # 2️⃣ Fallback – treat the supplied URL itself as a possible feed.  No
+        # link was found, so the scanner has read the whole page: parse those
+        # bytes instead of downloading the URL again.
+        feed_headers = response.headers
+        parsed_feed = parse_feed_bytes(bytes(scanner.body), response.url, feed_headers)
+        if _is_usable_feed(parsed_feed):
             feed_url = site_url
             logger.info("Site URL itself is a valid feed: %s", site_url)
 
@@ -102,25 +268,142 @@ def find_rss_feed(site_url: str, timeout: int = 5) -> Dict[str, str]:
         logger.info("No feed found for %s", site_url)
         return {}
 
-    # Parse the discovered feed to gather metadata (reuse if we already parsed)
-    if parsed_feed is None or feed_url != site_url:
-        parsed_feed = feedparser.parse(feed_url)
+    # Parse the discovered feed to gather metadata (the fallback already did)
+    if parsed_feed is None:
+        parsed_feed, feed_headers = _fetch_and_parse(feed_url, timeout)
 
     result: Dict[str, str] = {"url": feed_url}
     # Feed title – may be missing
     if getattr(parsed_feed, "feed", None) and parsed_feed.feed.get("title"):
         result["title"] = parsed_feed.feed["title"]
-    # ETag and Last‑Modified headers are available via the parser's ``etag``
-    # and ``modified`` attributes when present.
-    if getattr(parsed_feed, "etag", None):
-        result["etag"] = parsed_feed.etag
-    if getattr(parsed_feed, "modified", None):
-        result["last_modified"] = parsed_feed.modified
+    # ETag and Last‑Modified come from the feed response headers.
+    if feed_headers.get("ETag"):
+        result["etag"] = feed_headers["ETag"]
+    if feed_headers.get("Last-Modified"):
+        result["last_modified"] = feed_headers["Last-Modified"]
     return result
 
-def clean_html(html_content):
-    soup = BeautifulSoup(html_content, 'html.parser')
-    return soup.get_text(separator=' ', strip=True)
+async def find_rss_feed_async(
+    client: httpx.AsyncClient, site_url: str, timeout: float = 5
+) -> Dict[str, str]:
+    """Asynchronous counterpart of ``find_rss_feed`` using a shared *client*.
+
+    Performs the same discovery, but every request goes through *client* so
+    many sites can be resolved concurrently over pooled connections.  The
+    fallback reuses the already downloaded page instead of fetching it again,
+    and ``etag`` / ``last_modified`` come from the feed response headers.
+    Parsing runs in a worker thread.  Returns the same dictionary shape as
+    ``find_rss_feed`` (empty when no feed is found).
+    """
+    headers = {"User-Agent": "RSS-Finder/1.0"}
+    for attempt in range(_MAX_RATE_LIMIT_RETRIES + 1):
+        scanner = _LinkScanner()
+        link_href = retry_delay = None
+        try:
+            async with client.stream(
+                "GET", site_url, timeout=timeout, headers=headers, follow_redirects=True
+            ) as response:
+                if response.status_code == 429 and attempt < _MAX_RATE_LIMIT_RETRIES:
+                    retry_delay = retry_after(response.headers, _MAX_RETRY_AFTER)
+                if retry_delay is None:
+                    response.raise_for_status()
+                    async for chunk in response.aiter_bytes():
+                        if (link_href := scanner.feed(chunk)) or scanner.full:
+                            break
+                    link_href = link_href or scanner.finish()
+        except Exception as exc:  # pragma: no cover – network errors are environment specific
+            logger.error("Failed to fetch site %s: %s", site_url, exc)
+            return {}
+        if retry_delay is None:
+            break
+        logger.info("Rate limited by %s, retrying in %.1fs", site_url, retry_delay)
+        await asyncio.sleep(retry_delay)
+
+    if link_href:
+        feed_url = urljoin(str(response.url), link_href)
+        logger.info("Discovered feed via <link>: %s", feed_url)
+        body = bytearray()
+        try:
+            async with client.stream(
+                "GET", feed_url, timeout=timeout, headers=headers, follow_redirects=True
+            ) as response:
+                response.raise_for_status()
+                async for chunk in response.aiter_bytes():
+                    body += chunk
+                    if len(body) > _MAX_BODY_BYTES:
+                        logger.warning(
+                            "Feed %s exceeds %d bytes, not parsing it", feed_url, _MAX_BODY_BYTES
+                        )
+                        body.clear()
+                        break
+        except Exception as exc:  # pragma: no cover – network errors are environment specific
+            logger.error("Failed to fetch feed %s: %s", feed_url, exc)
+            return {}
+        parsed_feed = await asyncio.to_thread(
+            parse_feed_bytes, bytes(body), str(response.url), response.headers
+        )
+    elif scanner.full:
+        logger.warning("Stopped reading %s after %d bytes", site_url, _MAX_BODY_BYTES)
+        return {}
+    else:
+        parsed_feed = await asyncio.to_thread(
+            parse_feed_bytes, bytes(scanner.body), str(response.url), response.headers
+        )
+        if not _is_usable_feed(parsed_feed):
+            logger.info("No feed found for %s", site_url)
+            return {}
+        feed_url = site_url
+        logger.info("Site URL itself is a valid feed: %s", site_url)
+
+    result: Dict[str, str] = {"url": feed_url}
+    if parsed_feed.feed.get("title"):
+        result["title"] = parsed_feed.feed["title"]
+    if response.headers.get("ETag"):
+        result["etag"] = response.headers["ETag"]
+    if response.headers.get("Last-Modified"):
+        result["last_modified"] = response.headers["Last-Modified"]
+    return result
+
+async def find_rss_feeds_many(
+    site_urls: Iterable[str], concurrency: int = 20
+) -> List[Dict[str, str]]:
+    """Run ``find_rss_feed_async`` for every site in *site_urls* concurrently.
+
+    At most *concurrency* sites are fetched at once over one pooled client, so
+    total time tracks the slowest server rather than the sum of all of them.
+    Returns one result per URL, in order (empty dict when no feed was found).
+    """
+    semaphore = asyncio.Semaphore(concurrency)
+
+    async def discover(client: httpx.AsyncClient, url: str) -> Dict[str, str]:
+        async with semaphore:
+            return await find_rss_feed_async(client, url)
+
+    limits = httpx.Limits(max_connections=concurrency)
+    async with httpx.AsyncClient(timeout=10, limits=limits) as client:
+        return list(await asyncio.gather(*(discover(client, url) for url in site_urls)))
+
+def clean_html(html_content: str) -> str:
+    """Return the visible text of *html_content* as one space-separated string.
+
+    Text without markup or entities (many feed summaries are plain text) is
+    only whitespace-normalised.  Everything else is parsed with selectolax's
+    lexbor (C) parser when it is installed, falling back to BeautifulSoup.
+    Input beyond ``_MAX_HTML_CHARS`` characters is dropped.
+    """
+    if not html_content:
+        return ""
+    html_content = html_content[:_MAX_HTML_CHARS]
+    if "<" not in html_content and "&" not in html_content:
+        return " ".join(html_content.split())
+    if LexborHTMLParser is None:
+        soup = BeautifulSoup(html_content, "lxml")
+        return soup.get_text(separator=' ', strip=True)
+    tree = LexborHTMLParser(html_content)
+    tree.strip_tags(["script", "style"])
+    if tree.root is None:
+        return ""
+    return " ".join(tree.root.text(separator=" ").split())
 
 def parse_feed(feed_response: FeedParserDict) -> List[Dict[str, str]]:
     """Extract entries from a parsed feed response.
@@ -131,27 +414,21 @@ def parse_feed(feed_response: FeedParserDict) -> List[Dict[str, str]]:
         The dict from ``feedparser.parse()``.
     Returns
     -------
-    bool
-        ``True`` if the URL points to a valid feed, ``False`` otherwise.
-
+    list[dict]
+        One dict per entry with ``title``, ``link``, ``published``, ``tags``,
+        ``content`` and ``summary`` keys; empty for malformed or empty feeds.
+        ``content`` is the text of the entry's first content item.
     """
-    results: List[Dict[str, str]] = []
-    if not feed_response.bozo and bool(feed_response.entries):
-        for entry in feed_response.entries:
-            cleaned_summary = ""
-            cleaned_content = ""
-            if "summary" in entry:
-                cleaned_summary = clean_html(entry.summary)
-            if "content" in entry and entry.content:
-                for content_item in entry.content:
-                    cleaned_content = clean_html(content_item.value)
-            entry_data: Dict[str, str] = {
-                "title": entry.get("title", ""),
-                "link": entry.get("link", ""),
-                "published": entry.get("published", ""),
-                "tags": [tag.term for tag in entry.get("tags", [])],
-                "content": cleaned_content,
-                "summary": cleaned_summary,
-            }
-            results.append(entry_data)
-    return results
+    if not _is_usable_feed(feed_response):
+        return []
+    return [
+        {
+            "title": entry.get("title", ""),
+            "link": entry.get("link", ""),
+            "published": entry.get("published", ""),
+            "tags": [tag.term for tag in entry.get("tags") or ()],
+            "content": clean_html(entry.content[0].value) if entry.get("content") else "",
+            "summary": clean_html(entry.get("summary", "")),
+        }
+        for entry in feed_response.entries
+    ]
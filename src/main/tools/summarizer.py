@@ -1,19 +1,25 @@
 import asyncio
+import hashlib
 import json
 import logging
 import os
 import time
-from typing import Dict, List, Union
+from typing import Dict, List, Optional, Union
 
 import aiohttp
 from dotenv import load_dotenv
 
+from src.main.tools.utils import retry_after
+
 load_dotenv()
 
 logger = logging.getLogger(__name__)
 
 GROQ_API_KEY = os.getenv("GROQ_API_KEY")
 MAX_REQUESTS_PER_MINUTE = 30
+# How many summarization requests may be in flight at once; the rate limiter
+# still caps how many start per minute.
+MAX_CONCURRENT_REQUESTS = int(os.getenv("GROQ_MAX_CONCURRENCY", "4"))
 
 if not GROQ_API_KEY:
     raise ValueError("GROQ_API_KEY environment variable not set")
@@ -25,8 +31,14 @@ class SummarizationError(Exception):
 
 
 class RetryableError(SummarizationError):
-    """Errors that should trigger a retry (rate limits, timeouts, server errors)."""
-    pass
+    """Errors that should trigger a retry (rate limits, timeouts, server errors).
+
+    ``retry_after`` is the delay in seconds requested by the provider, if any.
+    """
+
+    def __init__(self, message: str, retry_after: Optional[float] = None):
+        super().__init__(message)
+        self.retry_after = retry_after
 
 
 class NonRetryableError(SummarizationError):
@@ -36,68 +48,158 @@ class NonRetryableError(SummarizationError):
 
 class RateLimiter:
     """Token bucket rate limiter for API calls.
-    
-    Proactively spaces requests to stay under the rate limit.
-    With 30 requests per 60 seconds, this enforces ~2 second spacing.
+
+    The bucket holds up to ``max_requests`` tokens and refills at
+    ``max_requests / window_seconds`` tokens per second, so a fresh window
+    allows a burst (30 requests at once for 30/60) and sustained use settles
+    at one request every ~2 seconds.
+    Safe to share between concurrent coroutines: callers queue on a lock so
+    each one takes its own token.
     """
 
     def __init__(self, max_requests: int, window_seconds: int):
         self.max_requests = max_requests
         self.window_seconds = window_seconds
-        self.min_interval = window_seconds / max_requests  # ~2 seconds for 30/60
-        self.last_request_time: float = 0.0
+        self.rate = max_requests / window_seconds  # tokens per second
+        self.tokens: float = float(max_requests)
+        self.last_refill: float = time.monotonic()
+        # Set from the provider's rate-limit headers after a 429.
+        self.resume_at: float = 0.0
+        self._lock = asyncio.Lock()
+
+    def defer(self, seconds: float) -> None:
+        """Hold back further requests for *seconds* (e.g. from ``Retry-After``).
+
+        The provider has told us the quota is used up, so the bucket is emptied
+        as well; it starts refilling from now.
+        """
+        now = time.monotonic()
+        self.resume_at = max(self.resume_at, now + seconds)
+        self.tokens = 0.0
+        self.last_refill = now
+
+    def _refill(self, now: float) -> None:
+        self.tokens = min(
+            float(self.max_requests), self.tokens + (now - self.last_refill) * self.rate
+        )
+        self.last_refill = now
 
     async def acquire(self):
         """Wait if necessary to stay under rate limit."""
-        now = time.time()
-        time_since_last = now - self.last_request_time
-        
-        if time_since_last < self.min_interval:
-            wait_time = self.min_interval - time_since_last
-            logger.debug("Rate limiting: waiting %.2f seconds", wait_time)
-            await asyncio.sleep(wait_time)
-        
-        self.last_request_time = time.time()
+        async with self._lock:
+            wait_time = self.resume_at - time.monotonic()
+            if wait_time > 0:
+                logger.debug("Rate limited by provider: waiting %.2f seconds", wait_time)
+                await asyncio.sleep(wait_time)
+
+            self._refill(time.monotonic())
+            if self.tokens < 1:
+                wait_time = (1 - self.tokens) / self.rate
+                logger.debug("Rate limiting: waiting %.2f seconds", wait_time)
+                await asyncio.sleep(wait_time)
+                self._refill(time.monotonic())
+            self.tokens -= 1
+
+
+# A 429's ``Retry-After`` is honoured only up to one rate-limit window.  Longer
+# waits (e.g. an exhausted daily quota) would hold the limiter, and with it
+# every caller, for hours; the entry is skipped instead.
+_MAX_RETRY_AFTER = 60.0
 
 
 # Global rate limiter
 _summarizer_limiter = RateLimiter(max_requests=MAX_REQUESTS_PER_MINUTE, window_seconds=60)
 
 
-async def summarize_text(text: str) -> Dict[str, Union[List[str], str]]:
-    """Summarize *text* using structured output with async/await.
+_SYSTEM_PROMPT = (
+    "You are a helpful assistant that summarizes text content concisely and clearly. "
+    "Based on the input, provide a clear and concise summary highlighting "
+    "the key themes in 100 words or less. Extract relevant tags and include them. No Yapping!"
+    """ Respond only with JSON using this format:
+    {
+        "tags": [
+            "tag1",
+            "tag2",
+            "tag3"
+        ],
+        "summary": "Short and concise summary"
+    }"""
+)
+
+_BATCH_SYSTEM_PROMPT = (
+    "You are a helpful assistant that summarizes text content concisely and clearly. "
+    "You will receive several numbered articles. For each article, provide a clear and "
+    "concise summary highlighting the key themes in 100 words or less and extract "
+    "relevant tags. No Yapping!"
+    """ Respond only with JSON using this format, with exactly one result per
+    article in the order the articles were given:
+    {
+        "results": [
+            {
+                "tags": ["tag1", "tag2", "tag3"],
+                "summary": "Short and concise summary"
+            }
+        ]
+    }"""
+)
+
+_API_URL = "https://api.groq.com/openai/v1/chat/completions"
+_MODEL = "openai/gpt-oss-120b"
+
+# Cached summaries are keyed on the model and both prompts (summaries may come
+# from either the single or the batched request) as well as the text, so
+# changing any of them stops stale summaries from being served.
+_CACHE_KEY_PREFIX = hashlib.sha256(
+    f"{_MODEL}\0{_SYSTEM_PROMPT}\0{_BATCH_SYSTEM_PROMPT}\0".encode("utf-8")
+)
+
+
+def summary_cache_key(text: str) -> str:
+    """Return the summary-cache key for *text* under the current model/prompt."""
+    digest = _CACHE_KEY_PREFIX.copy()
+    digest.update(text.encode("utf-8"))
+    return digest.hexdigest()
+
+# Reusable aiohttp session for all completions
+_session: aiohttp.ClientSession | None = None
+
+
+async def _get_session() -> aiohttp.ClientSession:
+    """Get or create the shared aiohttp session.
+
+    Keeping one session pools the keep-alive TLS connections to the API host
+    instead of resolving and handshaking again on every summary.
+    """
+    global _session
+    if _session is None or _session.closed:
+        _session = aiohttp.ClientSession(
+            timeout=aiohttp.ClientTimeout(total=30),
+            connector=aiohttp.TCPConnector(limit=32, ttl_dns_cache=300),
+        )
+    return _session
 
-    The function returns a dictionary with two keys:
-    * ``"summary"`` – the concise summary string (empty on error).
-    * ``"ai_tags"`` – a list of extracted tags (empty list on error).
 
-    Raises:
-    * ``RetryableError`` for rate limits, timeouts, and server errors.
-    * ``NonRetryableError`` for authentication and validation errors.
-    """
-    system_prompt = (
-        "You are a helpful assistant that summarizes text content concisely and clearly. "
-        "Based on the input, provide a clear and concise summary highlighting "
-        "the key themes in 100 words or less. Extract relevant tags and include them. No Yapping!"
-        """ Respond only with JSON using this format:
-        {
-            "tags": [
-                "tag1",
-                "tag2",
-                "tag3"
-            ],
-            "summary": "Short and concise summary"
-        }"""
-    )
+async def close_session() -> None:
+    """Close the shared aiohttp session (call on application shutdown)."""
+    global _session
+    if _session is not None:
+        await _session.close()
+        _session = None
 
-    api_url = "https://api.groq.com/openai/v1/chat/completions"
+
+async def _complete_json(system_prompt: str, user_content: str) -> dict:
+    """Send one rate-limited chat completion and return its parsed JSON content.
+
+    Raises ``RetryableError`` / ``NonRetryableError`` as documented on
+    ``summarize_text``.
+    """
     headers = {"Authorization": f"Bearer {GROQ_API_KEY}"}
 
     payload = {
-        "model": "openai/gpt-oss-120b",
+        "model": _MODEL,
         "messages": [
             {"role": "system", "content": system_prompt},
-            {"role": "user", "content": text},
+            {"role": "user", "content": user_content},
         ],
         "response_format": {"type": "json_object"},
     }
@@ -106,61 +208,56 @@ async def summarize_text(text: str) -> Dict[str, Union[List[str], str]]:
     await _summarizer_limiter.acquire()
 
     try:
-        timeout = aiohttp.ClientTimeout(total=30)
-        async with aiohttp.ClientSession(timeout=timeout) as session:
-            async with session.post(api_url, headers=headers, json=payload) as response:
-                # Handle 429 (rate limit) – retryable
-                if response.status == 429:
-                    raise RetryableError("Rate limit hit (429)")
-
-                # Handle 5xx (server errors) – retryable
-                if response.status >= 500:
-                    raise RetryableError(f"Server error {response.status}")
-
-                # Handle 401/403 (auth) – non-retryable
-                if response.status in (401, 403):
-                    raise NonRetryableError(f"Authentication error {response.status}")
-
-                # Handle other 4xx (client errors) – non-retryable
-                if response.status >= 400:
-                    raise NonRetryableError(f"Client error {response.status}")
-
-                try:
-                    data = await response.json()
-                except (json.JSONDecodeError, ValueError):
-                    raise NonRetryableError("Invalid JSON response")
-
-                # Validate response structure
-                if not isinstance(data, dict) or "choices" not in data:
-                    raise NonRetryableError("Unexpected response structure: missing 'choices'")
-
-                if not isinstance(data["choices"], list) or len(data["choices"]) == 0:
-                    raise NonRetryableError("Unexpected response structure: empty choices")
-
-                choice = data["choices"][0]
-                if not isinstance(choice, dict) or "message" not in choice:
-                    raise NonRetryableError("Unexpected response structure: missing message")
-
-                message = choice["message"]
-                if not isinstance(message, dict) or "content" not in message:
-                    raise NonRetryableError("Unexpected response structure: missing content")
-
-                content_str = message["content"]
-                try:
-                    parsed = json.loads(content_str)
-                except json.JSONDecodeError as e:
-                    raise NonRetryableError(f"Invalid JSON in response content: {e}")
-
-                summary = str(parsed.get("summary", "")).strip()
-                tags = parsed.get("tags", []) or []
-
-                # Validate tags is a list of strings
-                if not isinstance(tags, list):
-                    tags = []
-                else:
-                    tags = [str(t) for t in tags]
-
-                return {"summary": summary, "ai_tags": tags}
+        session = await _get_session()
+        async with session.post(_API_URL, headers=headers, json=payload) as response:
+            # Handle 429 (rate limit) – retryable
+            if response.status == 429:
+                delay = retry_after(response.headers, _MAX_RETRY_AFTER)
+                if delay:
+                    _summarizer_limiter.defer(delay)
+                raise RetryableError("Rate limit hit (429)", retry_after=delay)
+
+            # Handle 5xx (server errors) – retryable
+            if response.status >= 500:
+                raise RetryableError(f"Server error {response.status}")
+
+            # Handle 401/403 (auth) – non-retryable
+            if response.status in (401, 403):
+                raise NonRetryableError(f"Authentication error {response.status}")
+
+            # Handle other 4xx (client errors) – non-retryable
+            if response.status >= 400:
+                raise NonRetryableError(f"Client error {response.status}")
+
+            try:
+                data = await response.json()
+            except (json.JSONDecodeError, ValueError):
+                raise NonRetryableError("Invalid JSON response")
+
+            # Validate response structure
+            if not isinstance(data, dict) or "choices" not in data:
+                raise NonRetryableError("Unexpected response structure: missing 'choices'")
+
+            if not isinstance(data["choices"], list) or len(data["choices"]) == 0:
+                raise NonRetryableError("Unexpected response structure: empty choices")
+
+            choice = data["choices"][0]
+            if not isinstance(choice, dict) or "message" not in choice:
+                raise NonRetryableError("Unexpected response structure: missing message")
+
+            message = choice["message"]
+            if not isinstance(message, dict) or "content" not in message:
+                raise NonRetryableError("Unexpected response structure: missing content")
+
+            content_str = message["content"]
+            try:
+                parsed = json.loads(content_str)
+            except json.JSONDecodeError as e:
+                raise NonRetryableError(f"Invalid JSON in response content: {e}")
+
+            if not isinstance(parsed, dict):
+                raise NonRetryableError("Unexpected response content: not a JSON object")
+            return parsed
 
     except asyncio.TimeoutError:
         raise RetryableError("Request timeout")
@@ -168,6 +265,60 @@ async def summarize_text(text: str) -> Dict[str, Union[List[str], str]]:
         raise RetryableError(f"Network error: {e}")
 
 
+def _to_result(parsed: dict) -> Dict[str, Union[List[str], str]]:
+    """Normalise one model JSON object into ``{"summary", "ai_tags"}``."""
+    summary = str(parsed.get("summary", "")).strip()
+    tags = parsed.get("tags", []) or []
+
+    # Validate tags is a list of strings
+    if not isinstance(tags, list):
+        tags = []
+    else:
+        tags = [str(t) for t in tags]
+
+    return {"summary": summary, "ai_tags": tags}
+
+
+async def summarize_text(text: str) -> Dict[str, Union[List[str], str]]:
+    """Summarize *text* using structured output with async/await.
+
+    The function returns a dictionary with two keys:
+    * ``"summary"`` – the concise summary string (empty on error).
+    * ``"ai_tags"`` – a list of extracted tags (empty list on error).
+
+    Raises:
+    * ``RetryableError`` for rate limits, timeouts, and server errors.
+    * ``NonRetryableError`` for authentication and validation errors.
+    """
+    return _to_result(await _complete_json(_SYSTEM_PROMPT, text))
+
+
+async def summarize_texts(texts: List[str]) -> List[Dict[str, Union[List[str], str]]]:
+    """Summarize several *texts* with a single chat completion.
+
+    Returns one ``summarize_text``-shaped dict per input, in input order.  A
+    response that does not contain exactly one result per text (e.g. because it
+    was truncated) raises ``NonRetryableError`` so callers can fall back to
+    per-text calls.
+    """
+    if not texts:
+        return []
+    if len(texts) == 1:
+        return [await summarize_text(texts[0])]
+
+    user_content = "\n\n".join(
+        f"Article {i}:\n{text}" for i, text in enumerate(texts, 1)
+    )
+    parsed = await _complete_json(_BATCH_SYSTEM_PROMPT, user_content)
+    results = parsed.get("results")
+    if not isinstance(results, list) or len(results) != len(texts):
+        got = len(results) if isinstance(results, list) else 0
+        raise NonRetryableError(
+            f"Batched response returned {got} results for {len(texts)} texts"
+        )
+    return [_to_result(r if isinstance(r, dict) else {}) for r in results]
+
+
 if __name__ == "__main__":
     async def main():
         test_text = "The quick brown fox jumps over the lazy dog. This is a test of the summarization function."
@@ -176,5 +327,7 @@ if __name__ == "__main__":
             print("Summary:", result)
         except Exception as e:
             print(f"Error: {e}")
+        finally:
+            await close_session()
 
     asyncio.run(main())
@@ -1,16 +1,30 @@
 """Shared utilities for FeedQuest.
 
-Both the FastAPI HTTP server (`src/app_server.py`) and the FastMCP tool server
-(`src/server.py`) need to discover an RSS/Atom feed for a given website and
-register it in the SQLite‑backed registry.  This module provides a tiny API that
-encapsulates that workflow so the two servers can reuse the same logic.
+Helpers used by more than one of the tool modules (feed discovery, the
+fetcher and the summarizer) live here so each rule is implemented once.
 """
 
 from __future__ import annotations
 
-from typing import Dict
+from datetime import datetime, timezone
+from email.utils import parsedate_to_datetime
+from typing import Mapping, Optional
 
 
-from src.main.tools.rss_feed_utils import find_rss_feed
-
+def retry_after(headers: Mapping[str, str], max_delay: float) -> Optional[float]:
+    """Return the delay requested by a ``Retry-After`` header, in seconds.
 
+    Both the delta-seconds and HTTP-date forms are understood.  ``None`` means
+    there is no usable header or the wait exceeds *max_delay*, in which case
+    the caller should give up instead of waiting.
+    """
+    value = (headers.get("Retry-After") or "").strip()
+    try:
+        delay = float(value)
+    except ValueError:
+        try:
+            delay = (parsedate_to_datetime(value) - datetime.now(timezone.utc)).total_seconds()
+        except (TypeError, ValueError):
+            return None
+    delay = max(delay, 0.0)
+    return delay if delay <= max_delay else None
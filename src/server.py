@@ -6,12 +6,17 @@ Available tools:
 * ``list_registered_feeds() -> str`` – returns a newline‑separated list of stored feed URLs.
 """
 
+import asyncio
+import json
 import os
 from fastmcp import FastMCP
+try:
+    import orjson
+except ImportError:  # pragma: no cover – optional C-accelerated encoder
+    orjson = None
 
 from src.main.tools.rss_feed_utils import register_feed as register
 from src.main.tools.registry import list_feeds
-from src.main.tools.fetcher import fetch_all_entries
 
 mcp = FastMCP()
 
@@ -20,11 +25,12 @@ mcp = FastMCP()
 async def register_feed(site_url: str) -> str:
     """Detect an RSS/Atom feed for *site_url* and add it to the registry.
 
-    Delegates to the shared ``register_feed`` implementation and returns the
-    resulting message string.
+    Delegates to the shared ``register_feed`` implementation (run in a worker
+    thread, since discovery blocks on HTTP and SQLite) and returns the feed URL
+    or the error message.
     """
-    result = register(site_url)
-    return result["message"]
+    result = await asyncio.to_thread(register, site_url)
+    return str(result)
 
 
 @mcp.tool
@@ -34,11 +40,11 @@ async def list_registered_feeds() -> str:
     The underlying ``list_feeds`` now returns a list of dicts.  For the FastMCP
     tool we serialize the list to a JSON string so the consumer can parse it.
     """
-    feeds = list_feeds()
+    feeds = await asyncio.to_thread(list_feeds)
     if not feeds:
         return "No feeds registered."
-    import json
-
+    if orjson is not None:
+        return orjson.dumps(feeds).decode()
     return json.dumps(feeds)
 
 
@@ -47,8 +53,12 @@ async def fetch_entries() -> str:
     """Fetch new articles from all registered feeds concurrently.
 
     Calls the asynchronous ``fetch_all_entries`` utility and returns a concise
-    status string.
+    status string.  The fetcher (httpx, aiohttp and the Groq summarizer, which
+    requires ``GROQ_API_KEY``) is imported on first use so the discovery tools
+    start without it.
     """
+    from src.main.tools.fetcher import fetch_all_entries
+
     processed, added = await fetch_all_entries()
     return f"Fetched entries from {processed} feeds; added {added} new entries."
 
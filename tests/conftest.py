@@ -0,0 +1,18 @@
+import os
+
+import pytest
+
+# The summarizer refuses to import without an API key; tests never call Groq.
+os.environ.setdefault("GROQ_API_KEY", "test-key")
+
+from src.main import db
+
+
+@pytest.fixture
+def temp_db(tmp_path, monkeypatch):
+    """Point the registry at a fresh SQLite file for one test."""
+    db.close_pool()
+    monkeypatch.setattr(db, "DB_PATH", str(tmp_path / "feeds.db"))
+    monkeypatch.setattr(db, "_schema_ready", False)
+    yield db.DB_PATH
+    db.close_pool()
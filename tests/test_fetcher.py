@@ -0,0 +1,157 @@
+import asyncio
+import sqlite3
+
+import httpx
+import pytest
+
+from src.main.tools import fetcher
+from src.main.tools.fetcher import _fetch_and_store, _http_date
+from src.main.tools.registry import add_feed, get_feed, list_entries_by_feed
+from src.main.tools.summarizer import NonRetryableError, RetryableError
+
+FEED_URL = "http://example.com/feed.xml"
+OLD = "Mon, 06 Oct 2025 09:30:00 GMT"
+RSS = b"""<?xml version="1.0"?><rss version="2.0"><channel><title>Feed</title>
+<item><title>One</title><link>http://example.com/1</link><description>first</description></item>
+<item><title>Two</title><link>http://example.com/2</link><description>second</description></item>
+</channel></rss>"""
+
+
+@pytest.fixture
+def serve(monkeypatch):
+    """Answer feed requests with *handler* through the shared client."""
+    requests = []
+
+    def install(handler):
+        def record(request):
+            requests.append(request)
+            return handler(request)
+
+        monkeypatch.setattr(
+            fetcher, "_http_client", httpx.AsyncClient(transport=httpx.MockTransport(record))
+        )
+        return requests
+
+    return install
+
+
+def _summaries(result):
+    async def fake_batch(feed_url, contents):
+        return [dict(result) for _ in contents]
+
+    return fake_batch
+
+
+@pytest.fixture
+def calls(monkeypatch):
+    """Record summarizer calls; each test sets how the batch request behaves."""
+    log = {"batch": 0, "single": 0}
+
+    async def summarize_text(text):
+        log["single"] += 1
+        return {"summary": f"s:{text}", "ai_tags": []}
+
+    monkeypatch.setattr(fetcher, "summarize_text", summarize_text)
+
+    def batch_behaviour(behaviour):
+        async def summarize_texts(texts):
+            log["batch"] += 1
+            if isinstance(behaviour, Exception):
+                raise behaviour
+            return [{"summary": f"b:{t}", "ai_tags": []} for t in texts]
+
+        monkeypatch.setattr(fetcher, "summarize_texts", summarize_texts)
+        return log
+
+    return batch_behaviour
+
+
+def test_summarize_batch_uses_one_request(calls):
+    log = calls(None)
+    results = asyncio.run(fetcher._summarize_batch(FEED_URL, ["a", "b", "c"]))
+
+    assert [r["summary"] for r in results] == ["b:a", "b:b", "b:c"]
+    assert log == {"batch": 1, "single": 0}
+
+
+def test_summarize_batch_falls_back_on_malformed_reply(calls):
+    log = calls(NonRetryableError("2 results for 3 texts"))
+    results = asyncio.run(fetcher._summarize_batch(FEED_URL, ["a", "b", "c"]))
+
+    assert [r["summary"] for r in results] == ["s:a", "s:b", "s:c"]
+    assert log == {"batch": 1, "single": 3}
+
+
+def test_summarize_batch_does_not_retry_rate_limits(calls):
+    log = calls(RetryableError("Rate limit hit (429)"))
+    results = asyncio.run(fetcher._summarize_batch(FEED_URL, ["a", "b", "c"]))
+
+    assert results == [{"summary": "", "ai_tags": []}] * 3
+    assert log == {"batch": 1, "single": 0}
+
+
+def test_metadata_update_retries_locked_database(monkeypatch):
+    attempts = []
+
+    def upsert_feed(feed_info):
+        attempts.append(feed_info)
+        if len(attempts) < 3:
+            raise sqlite3.OperationalError("database is locked")
+        return True
+
+    monkeypatch.setattr(fetcher, "upsert_feed", upsert_feed)
+    response = httpx.Response(200, headers={"ETag": '"v2"'})
+    asyncio.run(fetcher._update_feed_metadata(FEED_URL, response, "hash"))
+
+    assert len(attempts) == 3
+    assert attempts[-1]["etag"] == '"v2"'
+    assert attempts[-1]["content_hash"] == "hash"
+
+
+def test_summarize_entries_with_nothing_to_summarize(caplog, calls):
+    log = calls(None)
+    caplog.set_level("INFO", logger=fetcher.logger.name)
+
+    assert asyncio.run(fetcher._summarize_entries(FEED_URL, [])) == []
+    assert log == {"batch": 0, "single": 0}
+    assert "cached summaries" not in caplog.text
+
+
+def test_content_hash_only_stored_once_every_entry_is_saved(temp_db, serve, monkeypatch):
+    add_feed({"url": FEED_URL, "last_modified": OLD})
+    serve(lambda request: httpx.Response(200, content=RSS))
+
+    # Rate limited: no summaries, nothing stored, so the body must be parsed again.
+    monkeypatch.setattr(fetcher, "_summarize_batch", _summaries({"summary": "", "ai_tags": []}))
+    assert asyncio.run(_fetch_and_store(FEED_URL, get_feed(FEED_URL))) == 0
+    assert "content_hash" not in get_feed(FEED_URL)
+
+    monkeypatch.setattr(fetcher, "_summarize_batch", _summaries({"summary": "s", "ai_tags": ["t"]}))
+    assert asyncio.run(_fetch_and_store(FEED_URL, get_feed(FEED_URL))) == 2
+    assert get_feed(FEED_URL).get("content_hash")
+    assert {e["url"] for e in list_entries_by_feed(FEED_URL)} == {
+        "http://example.com/1",
+        "http://example.com/2",
+    }
+
+    # Same body again: skipped by hash before any parsing or summarizing.
+    monkeypatch.setattr(fetcher, "_summarize_batch", None)
+    assert asyncio.run(_fetch_and_store(FEED_URL, get_feed(FEED_URL))) == 0
+
+
+def test_http_date():
+    assert _http_date("2025-10-06T09:30:00Z") == "Mon, 06 Oct 2025 09:30:00 GMT"
+    assert _http_date("yesterday") is None
+
+
+def test_not_modified_still_advances_last_modified(temp_db, serve):
+    add_feed({"url": FEED_URL, "etag": '"v1"', "last_modified": OLD, "content_hash": "h"})
+    requests = serve(lambda request: httpx.Response(304, headers={"ETag": '"v1"'}))
+
+    assert asyncio.run(_fetch_and_store(FEED_URL, get_feed(FEED_URL))) == 0
+
+    assert requests[0].headers["If-None-Match"] == '"v1"'
+    assert requests[0].headers["If-Modified-Since"] == OLD
+    feed = get_feed(FEED_URL)
+    assert feed["last_modified"] > "2025-10-06T09:30:00Z"
+    assert feed["content_hash"] == "h"
@@ -0,0 +1,55 @@
+import gc
+from xml.etree import ElementTree
+
+import pytest
+
+from src.main.tools.opml_helper import iter_opml, parse_opml
+
+
+def _outline(i):
+    return f'<outline text="f{i}" type="rss" xmlUrl="http://x/{i}.xml" htmlUrl="http://x/{i}"/>'
+
+
+def _write_opml(path, body):
+    path.write_text(
+        '<?xml version="1.0"?><opml version="2.0"><head><title>t</title></head>'
+        f"<body>{body}</body></opml>",
+        encoding="utf-8",
+    )
+    return str(path)
+
+
+def test_parse_opml_keeps_document_order(tmp_path):
+    path = _write_opml(
+        tmp_path / "subs.opml",
+        f'<outline text="Tech">{_outline(0)}{_outline(1)}</outline>{_outline(2)}',
+    )
+
+    feeds = parse_opml(path)
+
+    assert [f["text"] for f in feeds] == ["Tech", "f0", "f1", "f2"]
+    assert feeds[0] == {"text": "Tech", "type": "", "xmlUrl": "", "htmlUrl": ""}
+    assert feeds[2] == {"text": "f1", "type": "rss", "xmlUrl": "http://x/1.xml", "htmlUrl": "http://x/1"}
+
+
+def _live_outlines():
+    gc.collect()
+    return sum(
+        1 for o in gc.get_objects() if isinstance(o, ElementTree.Element) and o.tag == "outline"
+    )
+
+
+@pytest.mark.parametrize("folder", [False, True])
+def test_iter_opml_releases_finished_outlines(tmp_path, folder):
+    outlines = "".join(_outline(i) for i in range(2000))
+    if folder:
+        outlines = f'<outline text="Folder">{outlines}</outline>'
+    path = _write_opml(tmp_path / "big.opml", outlines)
+
+    baseline = _live_outlines()
+    seen = 0
+    for seen, _ in enumerate(iter_opml(path), 1):
+        if seen == 1900:
+            # Only the parser's read-ahead buffer is alive, not the 1900 already seen.
+            assert _live_outlines() - baseline < 500
+    assert seen == 2000 + folder
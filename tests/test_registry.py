@@ -0,0 +1,117 @@
+import sqlite3
+
+import pytest
+
+from src.main.tools import registry
+from src.main.tools.registry import (
+    _rfc822_to_iso,
+    add_entries_bulk,
+    add_feed,
+    add_feeds_bulk,
+    existing_entry_urls,
+    get_feed,
+    list_feeds,
+    upsert_feed,
+)
+
+
+@pytest.mark.parametrize(
+    "ts, expected",
+    [
+        ("Mon, 06 Oct 2025 09:30:00 GMT", "2025-10-06T09:30:00Z"),
+        ("Mon, 6 Oct 2025 09:30:05 UTC", "2025-10-06T09:30:05Z"),
+        ("Sat, 29 Feb 2020 23:59:59 GMT", "2020-02-29T23:59:59Z"),
+    ],
+)
+def test_rfc822_to_iso(ts, expected):
+    assert _rfc822_to_iso(ts) == expected
+
+
+@pytest.mark.parametrize(
+    "ts",
+    [
+        "Mon, 31 Feb 2025 09:30:00 GMT",
+        "Mon, 06 Oct 2025 -1:30:00 GMT",
+        "Mon, 06 Oct 2025 24:00:00 GMT",
+        "Mon, 06 Foo 2025 09:30:00 GMT",
+        "2025-10-06T09:30:00Z",
+        "",
+    ],
+)
+def test_rfc822_to_iso_rejects_invalid(ts):
+    with pytest.raises(ValueError):
+        _rfc822_to_iso(ts)
+
+
+def test_normalize_timestamp_falls_back_to_now(monkeypatch):
+    monkeypatch.setattr(registry, "_utc_now_iso", lambda: "NOW")
+    assert registry._normalize_timestamp("not a date") == "NOW"
+    assert registry._normalize_timestamp("") == "NOW"
+
+
+def test_add_feed_reports_locked_database_as_false(monkeypatch):
+    def locked():
+        raise sqlite3.OperationalError("database is locked")
+
+    monkeypatch.setattr(registry, "get_connection", locked)
+    assert add_feed({"url": "http://a/feed"}) is False
+    with pytest.raises(sqlite3.OperationalError):
+        upsert_feed({"url": "http://a/feed"})
+
+
+def test_add_entries_bulk_skips_duplicates_and_unknown_feeds(temp_db):
+    add_feed({"url": "http://a/feed"})
+    entries = [{"title": "One", "url": "http://a/1", "tags": ["x", "y"]}]
+
+    assert add_entries_bulk("http://a/feed", entries) == 1
+    assert add_entries_bulk("http://a/feed", entries) == 0
+    assert add_entries_bulk("http://unknown/feed", entries) == 0
+
+
+def test_existing_entry_urls(temp_db):
+    add_feed({"url": "http://a/feed"})
+    add_entries_bulk("http://a/feed", [
+        {"title": "One", "url": "http://a/1"},
+        {"title": "Two", "url": "http://a/2"},
+    ])
+
+    assert existing_entry_urls(["http://a/1", "http://a/3", None, "http://a/2"]) == {
+        "http://a/1",
+        "http://a/2",
+    }
+    assert existing_entry_urls([]) == set()
+
+
+def test_add_feeds_bulk_inserts_new_feeds_only(temp_db):
+    add_feed({"url": "http://a/feed", "title": "Old"})
+
+    added = add_feeds_bulk([
+        {"url": "http://a/feed", "title": "New"},
+        {"url": "http://b/feed", "title": "B", "last_modified": "Mon, 06 Oct 2025 09:30:00 GMT"},
+        {"url": "  "},
+        {"url": "http://c/feed"},
+    ])
+
+    assert added == 2
+    assert [f["url"] for f in list_feeds()] == ["http://a/feed", "http://b/feed", "http://c/feed"]
+    assert get_feed("http://a/feed")["title"] == "Old"
+    assert get_feed("http://b/feed")["last_modified"] == "2025-10-06T09:30:00Z"
+    assert add_feeds_bulk([]) == 0
+
+
+def test_add_feed_upserts_and_keeps_unset_fields(temp_db):
+    assert add_feed({"url": " http://a/feed ", "title": "A", "etag": "e1"})
+    assert add_feed({"url": "http://a/feed", "content_hash": "h"})
+
+    feed = get_feed("http://a/feed")
+    assert feed["title"] == "A"
+    assert feed["etag"] == "e1"
+    assert feed["content_hash"] == "h"
+    assert not add_feed({"url": ""})
+
+
+def test_list_feeds_omits_empty_optional_columns(temp_db):
+    add_feed({"url": "http://a/feed"})
+
+    (feed,) = list_feeds()
+    assert set(feed) == {"url", "added", "last_modified"}
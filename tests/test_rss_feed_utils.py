@@ -0,0 +1,104 @@
+import pytest
+
+from src.main.tools import rss_feed_utils
+from src.main.tools.rss_feed_utils import (
+    _LinkScanner,
+    _first_feed_href,
+    clean_html,
+    parse_feed,
+    parse_feed_bytes,
+)
+
+RSS = b"""<?xml version="1.0" encoding="utf-8"?>
+<rss version="2.0" xmlns:content="http://purl.org/rss/1.0/modules/content/">
+<channel><title>Feed</title>
+<item>
+  <title>Caf\xc3\xa9</title><link>/post</link><category>news</category>
+  <description>&lt;b&gt;Hi&lt;/b&gt; &amp;amp; bye</description>
+  <content:encoded>&lt;p&gt;first&lt;/p&gt;</content:encoded>
+</item>
+</channel></rss>"""
+
+PAGE = b"""<html><head>
+<link rel="stylesheet" href="/style.css">
+<link rel="alternate" type="text/html" href="/other">
+<link rel="Alternate" type="application/RSS+xml" href="/feed.xml">
+<link rel="alternate" type="application/atom+xml" href="/atom.xml">
+</head><body>text</body></html>"""
+
+
+def test_first_feed_href():
+    links = [
+        {"rel": "stylesheet"},
+        {"type": "application/rss+xml"},
+        {"type": "APPLICATION/ATOM+XML", "href": "/atom"},
+        {"type": "application/rss+xml", "href": "/rss"},
+    ]
+    assert _first_feed_href(links) == "/atom"
+    assert _first_feed_href([{"type": "text/css", "href": "/x"}]) is None
+
+
+def test_link_scanner_stops_at_first_feed_link():
+    scanner = _LinkScanner()
+    chunks = [PAGE[i:i + 16] for i in range(0, len(PAGE), 16)]
+    found = None
+    for chunk in chunks:
+        if found := scanner.feed(chunk):
+            break
+    assert found == "/feed.xml"
+    assert len(scanner.body) < len(PAGE)
+
+
+def test_link_scanner_finish_reports_unterminated_tag():
+    scanner = _LinkScanner()
+    assert scanner.feed(b'<link rel="alternate" type="application/rss+xml" href="/f"') is None
+    assert scanner.finish() == "/f"
+
+
+def test_link_scanner_empty_page():
+    assert _LinkScanner().finish() is None
+
+
+@pytest.mark.parametrize(
+    "content_type", [None, "text/html", "text/plain", "text/xml", "application/octet-stream"]
+)
+def test_parse_feed_ignores_content_type_complaints(content_type):
+    headers = {"Content-Type": content_type} if content_type else {}
+    entries = parse_feed(parse_feed_bytes(RSS, "http://x/", headers))
+    assert [e["title"] for e in entries] == ["Café"]
+
+
+def test_parse_feed_rejects_html():
+    feed = parse_feed_bytes(PAGE, "http://x/", {"Content-Type": "text/html"})
+    assert parse_feed(feed) == []
+
+
+def test_clean_html():
+    assert clean_html("") == ""
+    assert clean_html("  plain\n text ") == "plain text"
+    assert clean_html("<p>Hi <b>there</b></p><script>x()</script>") == "Hi there"
+    assert clean_html("Fish &amp; chips") == "Fish & chips"
+
+
+def test_parse_feed():
+    feed = parse_feed_bytes(RSS, "http://x/", {"Content-Type": "application/rss+xml"})
+    assert parse_feed(feed) == [{
+        "title": "Café",
+        "link": "http://x/post",
+        "published": "",
+        "tags": ["news"],
+        "content": "first",
+        "summary": "Hi & bye",
+    }]
+
+
+def test_link_scanner_full(monkeypatch):
+    monkeypatch.setattr(rss_feed_utils, "_MAX_BODY_BYTES", 10)
+    scanner = _LinkScanner()
+    scanner.feed(b"<html><body>")
+    assert scanner.full
+
+
+def test_clean_html_caps_input(monkeypatch):
+    monkeypatch.setattr(rss_feed_utils, "_MAX_HTML_CHARS", 10)
+    assert clean_html("<p>" + "a" * 50 + "</p>") == "a" * 7
@@ -0,0 +1,157 @@
+import asyncio
+import hashlib
+
+import pytest
+
+from src.main.tools import summarizer
+from src.main.tools.summarizer import (
+    NonRetryableError,
+    RateLimiter,
+    RetryableError,
+    summarize_texts,
+    summary_cache_key,
+)
+
+
+class FakeResponse:
+    def __init__(self, status, headers):
+        self.status = status
+        self.headers = headers
+
+    async def __aenter__(self):
+        return self
+
+    async def __aexit__(self, *exc):
+        return False
+
+
+class FakeSession:
+    """Answers every POST with the given status and headers."""
+
+    def __init__(self, status, headers):
+        self.response = FakeResponse(status, headers)
+
+    def post(self, *args, **kwargs):
+        return self.response
+
+
+@pytest.fixture
+def respond(monkeypatch):
+    limiter = RateLimiter(max_requests=30, window_seconds=60)
+    monkeypatch.setattr(summarizer, "_summarizer_limiter", limiter)
+
+    def install(status, headers):
+        async def get_session():
+            return FakeSession(status, headers)
+
+        monkeypatch.setattr(summarizer, "_get_session", get_session)
+        return limiter
+
+    return install
+
+
+def test_rate_limit_defers_the_limiter(respond):
+    limiter = respond(429, {"Retry-After": "5"})
+
+    with pytest.raises(RetryableError) as excinfo:
+        asyncio.run(summarizer.summarize_text("text"))
+
+    assert excinfo.value.retry_after == 5.0
+    assert limiter.resume_at > 0
+    assert limiter.tokens == 0
+
+
+def test_long_rate_limit_is_skipped_not_waited_for(respond):
+    limiter = respond(429, {"Retry-After": "52330", "x-ratelimit-reset-requests": "14h32m10s"})
+
+    with pytest.raises(RetryableError) as excinfo:
+        asyncio.run(summarizer.summarize_text("text"))
+
+    assert excinfo.value.retry_after is None
+    assert limiter.resume_at == 0.0
+
+
+def test_summarize_texts_maps_results_in_order(monkeypatch):
+    async def fake_complete(system_prompt, user_content):
+        assert system_prompt == summarizer._BATCH_SYSTEM_PROMPT
+        assert "Article 2:\nsecond" in user_content
+        return {"results": [{"summary": " one ", "tags": ["a"]}, {"summary": "two", "tags": "x"}]}
+
+    monkeypatch.setattr(summarizer, "_complete_json", fake_complete)
+    assert asyncio.run(summarize_texts(["first", "second"])) == [
+        {"summary": "one", "ai_tags": ["a"]},
+        {"summary": "two", "ai_tags": []},
+    ]
+
+
+def test_summarize_texts_rejects_short_response(monkeypatch):
+    async def fake_complete(system_prompt, user_content):
+        return {"results": [{"summary": "one", "tags": []}]}
+
+    monkeypatch.setattr(summarizer, "_complete_json", fake_complete)
+    with pytest.raises(NonRetryableError):
+        asyncio.run(summarize_texts(["first", "second"]))
+
+
+class FakeClock:
+    """Stands in for ``time.monotonic`` and ``asyncio.sleep``."""
+
+    def __init__(self):
+        self.now = 1000.0
+        self.slept = []
+
+    def monotonic(self):
+        return self.now
+
+    async def sleep(self, seconds):
+        self.slept.append(seconds)
+        self.now += seconds
+
+
+@pytest.fixture
+def clock(monkeypatch):
+    fake = FakeClock()
+    monkeypatch.setattr(summarizer.time, "monotonic", fake.monotonic)
+    monkeypatch.setattr(summarizer.asyncio, "sleep", fake.sleep)
+    return fake
+
+
+def test_rate_limiter_allows_burst_then_paces(clock):
+    limiter = RateLimiter(max_requests=3, window_seconds=3)
+
+    async def run():
+        for _ in range(5):
+            await limiter.acquire()
+
+    asyncio.run(run())
+    assert clock.slept == pytest.approx([1.0, 1.0])
+
+
+def test_rate_limiter_refills_over_time(clock):
+    limiter = RateLimiter(max_requests=2, window_seconds=2)
+
+    async def run():
+        await limiter.acquire()
+        await limiter.acquire()
+        clock.now += 10  # more than a full window: the bucket is full again
+        await limiter.acquire()
+        await limiter.acquire()
+
+    asyncio.run(run())
+    assert clock.slept == []
+
+
+def test_rate_limiter_defer_waits_and_empties_bucket(clock):
+    limiter = RateLimiter(max_requests=10, window_seconds=10)
+    limiter.defer(5)
+
+    asyncio.run(limiter.acquire())
+    # 5s for the provider's delay; those 5s refill 5 tokens, so no extra wait.
+    assert clock.slept == pytest.approx([5.0])
+    assert limiter.tokens == pytest.approx(4.0)
+
+
+def test_summary_cache_key_covers_model_and_prompts():
+    seed = f"{summarizer._MODEL}\0{summarizer._SYSTEM_PROMPT}\0{summarizer._BATCH_SYSTEM_PROMPT}\0"
+    assert summary_cache_key("text") == hashlib.sha256((seed + "text").encode()).hexdigest()
+    assert summary_cache_key("text") != summary_cache_key("other")
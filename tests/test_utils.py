@@ -0,0 +1,34 @@
+from datetime import datetime, timedelta, timezone
+from email.utils import format_datetime
+
+import pytest
+
+from src.main.tools.utils import retry_after
+
+
+@pytest.mark.parametrize(
+    "headers, expected",
+    [
+        ({"Retry-After": "7"}, 7.0),
+        ({"Retry-After": " 1.5 "}, 1.5),
+        ({"Retry-After": "-3"}, 0.0),
+        ({"Retry-After": "60"}, 60.0),
+        ({"Retry-After": "52330"}, None),
+        ({"Retry-After": "soon"}, None),
+        ({"x-ratelimit-reset-requests": "14h32m10s"}, None),
+        ({}, None),
+    ],
+)
+def test_retry_after_seconds(headers, expected):
+    assert retry_after(headers, max_delay=60) == expected
+
+
+def test_retry_after_http_date():
+    soon = format_datetime(datetime.now(timezone.utc) + timedelta(seconds=10), usegmt=True)
+    assert 0 < retry_after({"Retry-After": soon}, max_delay=30) <= 10
+
+    past = format_datetime(datetime.now(timezone.utc) - timedelta(hours=1), usegmt=True)
+    assert retry_after({"Retry-After": past}, max_delay=30) == 0.0
+
+    later = format_datetime(datetime.now(timezone.utc) + timedelta(hours=1), usegmt=True)
+    assert retry_after({"Retry-After": later}, max_delay=30) is None